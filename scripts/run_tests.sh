@@ -6,9 +6,11 @@
 #   ./scripts/run_tests.sh phase1    # Run Phase 1 tests only
 #   ./scripts/run_tests.sh phase2    # Run Phase 2 tests only
 #   ./scripts/run_tests.sh phase3    # Run Phase 3 tests only
-#   ./scripts/run_tests.sh phase4    # Run Phase 4 tests only
+#   ./scripts/run_tests.sh phase4    # Run Phase 4 tests only (across pytest-xdist workers)
 #   ./scripts/run_tests.sh fast      # Run non-slow tests only
 #   ./scripts/run_tests.sh all       # Run all tests with verbose output
+#   ./scripts/run_tests.sh parallel  # Run all tests across pytest-xdist workers
+#   ./scripts/run_tests.sh offline   # Run unit tests against moto (no AWS access)
 
 set -e
 
@@ -49,7 +51,8 @@ case "${1:-all}" in
         ;;
     phase4)
         echo "Running Phase 4 tests (GDPR Compliance)..."
-        pytest -m phase4 -v
+        # Phase 4 checks are independent read-only describe calls, so spread them over workers
+        pytest -m phase4 -n auto -v
         ;;
     fast)
         echo "Running fast tests only (excluding slow tests)..."
@@ -63,8 +66,16 @@ case "${1:-all}" in
         echo "Running all tests..."
         pytest -v
         ;;
+    parallel)
+        echo "Running all tests in parallel (pytest-xdist)..."
+        pytest -n auto -v
+        ;;
+    offline)
+        echo "Running unit tests offline (moto)..."
+        pytest --offline -m unit -v
+        ;;
     *)
-        echo "Usage: $0 {phase1|phase2|phase3|phase4|fast|integration|all}"
+        echo "Usage: $0 {phase1|phase2|phase3|phase4|fast|integration|all|parallel|offline}"
         echo ""
         echo "Options:"
         echo "  phase1      - Infrastructure tests (KMS, VPC, S3, Firehose)"
@@ -74,6 +85,8 @@ case "${1:-all}" in
         echo "  fast        - All tests except slow ones"
         echo "  integration - Integration tests only"
         echo "  all         - Run all tests (default)"
+        echo "  parallel    - Run all tests across pytest-xdist workers"
+        echo "  offline     - Unit tests against moto, no AWS access needed"
         exit 1
         ;;
 esac
@@ -59,15 +59,20 @@ def get_salt_from_secrets_manager(secret_arn: str) -> str:
     return secret_dict['salt']
 
 
-def create_hash_udf(salt: str):
-    """Create a UDF for SHA256 hashing with salt."""
+def make_patient_id_hasher(salt: str):
+    """Return a function mapping a patient ID to its salted SHA256 hash (64 hex chars)."""
     def hash_patient_id(patient_id: str) -> str:
         if patient_id is None:
             return None
         combined = f"{patient_id}{salt}"
         return hashlib.sha256(combined.encode('utf-8')).hexdigest()
 
-    return F.udf(hash_patient_id, StringType())
+    return hash_patient_id
+
+
+def create_hash_udf(salt: str):
+    """Create a UDF for SHA256 hashing with salt."""
+    return F.udf(make_patient_id_hasher(salt), StringType())
 
 
 def load_to_redshift(df_curated, glue_context, year: str, month: str, day: str):
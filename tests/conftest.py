@@ -7,15 +7,34 @@ Run all tests with: pytest
 """
 
 import os
+import re
+import json
+import time
+import pickle
+import fnmatch
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 import pytest
 import boto3
 from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 
 # Default configuration
 DEFAULT_ENVIRONMENT = "gdpr-healthcare"
 DEFAULT_REGION = "eu-central-1"
 
 
+# Shared by every client: adaptive retries, a pool sized for the prefetch
+# thread pools, and TCP keep-alive so connections are reused. Clients live
+# for the whole session, so each xdist worker keeps one warm pool per endpoint.
+BOTO_CONFIG = Config(
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    max_pool_connections=50,
+    tcp_keepalive=True
+)
+
+
 def get_env_name():
     """Get environment name from env var or default."""
     return os.environ.get("ENVIRONMENT_NAME", DEFAULT_ENVIRONMENT)
@@ -32,6 +51,18 @@ def environment_name():
     return get_env_name()
 
 
+@pytest.fixture(scope="session")
+def glue_job_name(environment_name):
+    """Name of the Glue ETL job."""
+    return f"{environment_name}-etl-job"
+
+
+@pytest.fixture(scope="session")
+def workgroup_name(environment_name):
+    """Name of the Redshift Serverless workgroup."""
+    return f"{environment_name}-workgroup"
+
+
 @pytest.fixture(scope="session")
 def aws_region():
     """AWS region for deployment."""
@@ -39,164 +70,876 @@ def aws_region():
 
 
 @pytest.fixture(scope="session")
-def boto_config():
-    """Boto3 client configuration with retries."""
-    return Config(
-        region_name=get_region(),
-        retries={"max_attempts": 3, "mode": "adaptive"}
-    )
+def aws_backend(request, environment_name, aws_region):
+    """
+    Real AWS by default; with --offline, moto's in-memory backend seeded with Phase 2/4 resources.
+
+    Offline, `stacks` holds describe_stacks stand-ins for the seeded stacks,
+    since moto cannot deploy the CloudFormation templates here.
+    """
+    if not request.config.getoption("--offline"):
+        yield SimpleNamespace(name="aws", stacks=None)
+        return
+
+    from moto import mock_aws
+    from tests.offline import seed_resources
+
+    with mock_aws(config={"iam": {"load_aws_managed_policies": True}}):
+        stacks = seed_resources(boto3.Session(), environment_name, aws_region)
+        yield SimpleNamespace(name="moto", stacks=stacks)
+
+
+@pytest.fixture(scope="session")
+def aws_session(aws_backend, aws_region):
+    """One boto3 session for every client, so credential and service-model loading happens once."""
+    return boto3.session.Session(region_name=aws_region)
+
+
+# Describe calls replayed from disk with --use-aws-cache, per service name
+CACHED_DESCRIBE_OPERATIONS = {
+    "ec2": ("DescribeVpcEndpoints",),
+    "logs": ("DescribeLogGroups",),
+    "cloudwatch": ("DescribeAlarms",)
+}
+AWS_CACHE_TTL_SECONDS = 12 * 60 * 60
+
+
+@pytest.fixture(scope="session")
+def aws_describe_cache(request, aws_backend):
+    """Describe responses persisted in .cache/aws-describe.pickle with --use-aws-cache (None otherwise)."""
+    if not request.config.getoption("--use-aws-cache") or aws_backend.name == "moto":
+        yield None
+        return
+
+    from filelock import FileLock
+
+    cache_file = request.config.rootpath / ".cache" / "aws-describe.pickle"
+    cache_file.parent.mkdir(exist_ok=True)
+    lock = FileLock(f"{cache_file}.lock")
+
+    def load():
+        if not cache_file.is_file():
+            return {}
+        entries = pickle.loads(cache_file.read_bytes())
+        return {key: entry for key, entry in entries.items() if is_fresh(entry)}
+
+    with lock:
+        cache = load()
+    session_start = time.time()
+    yield cache
+
+    fetched = {key: entry for key, entry in cache.items() if entry[0] >= session_start}
+    if fetched:
+        with lock:
+            cache_file.write_bytes(pickle.dumps({**load(), **fetched}))
+
+
+# Entries are (fetched_at, response); stale ones are skipped on load and on
+# lookup, and only entries fetched this session are merged back into the file.
+def is_fresh(entry):
+    """Whether a (fetched_at, response) cache entry is within AWS_CACHE_TTL_SECONDS."""
+    return time.time() - entry[0] < AWS_CACHE_TTL_SECONDS
+
+
+def replay_describe_calls(client, service_name, cache):
+    """Serve the client's CACHED_DESCRIBE_OPERATIONS from `cache`, recording misses."""
+    event_service = client.meta.service_model.service_id.hyphenize()
+
+    def before_call(params, context, **kwargs):
+        key = repr((params["url"], params["body"]))
+        context["aws_cache_key"] = key
+        entry = cache.get(key)
+        if entry is not None and is_fresh(entry):
+            context["aws_cache_hit"] = True
+            return SimpleNamespace(status_code=200), entry[1]
+        return None
+
+    def after_call(http_response, parsed, context, **kwargs):
+        if not context.get("aws_cache_hit") and http_response.status_code < 300:
+            cache[context["aws_cache_key"]] = (time.time(), parsed)
+
+    for operation in CACHED_DESCRIBE_OPERATIONS.get(service_name, ()):
+        client.meta.events.register(f"before-call.{event_service}.{operation}", before_call)
+        client.meta.events.register(f"after-call.{event_service}.{operation}", after_call)
+
+
+@pytest.fixture(scope="session")
+def boto_config(aws_backend, aws_region):
+    """Boto3 client configuration with adaptive retries and connection reuse."""
+    return BOTO_CONFIG.merge(Config(region_name=aws_region))
 
 
 @pytest.fixture(scope="session")
-def cloudformation_client(boto_config):
+def aws_client(aws_session, boto_config, aws_describe_cache):
+    """
+    Memoized client factory: aws_client("ec2") always returns the same client.
+
+    Clients share the session's loaders and keep their connection pools warm
+    for the whole run.
+    """
+    @functools.cache
+    def _client(service_name):
+        client = aws_session.client(service_name, config=boto_config)
+        if aws_describe_cache is not None:
+            replay_describe_calls(client, service_name, aws_describe_cache)
+        return client
+
+    return _client
+
+
+# Clients built together before the first Phase 4 describe call so model
+# loading and endpoint resolution are not charged to whichever test runs first
+WARM_CLIENT_SERVICES = ("ec2", "logs", "cloudwatch")
+
+
+@pytest.fixture(scope="session")
+def warm_boto3(aws_client, aws_region):
+    """
+    Build the Phase 4 describe clients once and open the EC2 connection.
+
+    Requested by the ec2/logs/cloudwatch client fixtures only, so runs that
+    select pure-logic tests never reach AWS.
+    """
+    for service_name in WARM_CLIENT_SERVICES:
+        aws_client(service_name)
+    try:
+        aws_client("ec2").describe_regions(RegionNames=[aws_region])
+    except (BotoCoreError, ClientError):
+        # Best effort: tests that need AWS report missing credentials themselves
+        pass
+
+
+@pytest.fixture(scope="session")
+def cloudformation_client(aws_client):
     """CloudFormation client."""
-    return boto3.client("cloudformation", config=boto_config)
+    return aws_client("cloudformation")
 
 
 @pytest.fixture(scope="session")
-def s3_client(boto_config):
+def s3_client(aws_client):
     """S3 client."""
-    return boto3.client("s3", config=boto_config)
+    return aws_client("s3")
 
 
 @pytest.fixture(scope="session")
-def ec2_client(boto_config):
+def ec2_client(aws_client, warm_boto3):
     """EC2 client."""
-    return boto3.client("ec2", config=boto_config)
+    return aws_client("ec2")
 
 
 @pytest.fixture(scope="session")
-def kms_client(boto_config):
+def kms_client(aws_client):
     """KMS client."""
-    return boto3.client("kms", config=boto_config)
+    return aws_client("kms")
 
 
 @pytest.fixture(scope="session")
-def secretsmanager_client(boto_config):
+def secretsmanager_client(aws_client):
     """Secrets Manager client."""
-    return boto3.client("secretsmanager", config=boto_config)
+    return aws_client("secretsmanager")
 
 
 @pytest.fixture(scope="session")
-def firehose_client(boto_config):
+def firehose_client(aws_client):
     """Kinesis Firehose client."""
-    return boto3.client("firehose", config=boto_config)
+    return aws_client("firehose")
 
 
 @pytest.fixture(scope="session")
-def glue_client(boto_config):
+def glue_client(aws_client):
     """Glue client."""
-    return boto3.client("glue", config=boto_config)
+    return aws_client("glue")
 
 
 @pytest.fixture(scope="session")
-def redshift_serverless_client(boto_config):
+def redshift_serverless_client(aws_client):
     """Redshift Serverless client."""
-    return boto3.client("redshift-serverless", config=boto_config)
+    return aws_client("redshift-serverless")
 
 
 @pytest.fixture(scope="session")
-def redshift_data_client(boto_config):
+def redshift_data_client(aws_client):
     """Redshift Data API client."""
-    return boto3.client("redshift-data", config=boto_config)
+    return aws_client("redshift-data")
 
 
 @pytest.fixture(scope="session")
-def iam_client(boto_config):
+def iam_client(aws_client):
     """IAM client."""
-    return boto3.client("iam", config=boto_config)
+    return aws_client("iam")
 
 
 @pytest.fixture(scope="session")
-def dynamodb_client(boto_config):
+def dynamodb_client(aws_client):
     """DynamoDB client."""
-    return boto3.client("dynamodb", config=boto_config)
+    return aws_client("dynamodb")
 
 
 @pytest.fixture(scope="session")
-def lambda_client(boto_config):
+def lambda_client(aws_client):
     """Lambda client."""
-    return boto3.client("lambda", config=boto_config)
+    return aws_client("lambda")
 
 
 @pytest.fixture(scope="session")
-def athena_client(boto_config):
+def athena_client(aws_client):
     """Athena client."""
-    return boto3.client("athena", config=boto_config)
+    return aws_client("athena")
 
 
 @pytest.fixture(scope="session")
-def logs_client(boto_config):
+def logs_client(aws_client, warm_boto3):
     """CloudWatch Logs client."""
-    return boto3.client("logs", config=boto_config)
+    return aws_client("logs")
 
 
 @pytest.fixture(scope="session")
-def cloudwatch_client(boto_config):
+def cloudwatch_client(aws_client, warm_boto3):
     """CloudWatch client."""
-    return boto3.client("cloudwatch", config=boto_config)
+    return aws_client("cloudwatch")
+
+
+def cached_across_workers(tmp_path_factory, name, fetch):
+    """Call fetch() once per test run and share its JSON round-trip with all xdist workers."""
+    if not os.environ.get("PYTEST_XDIST_WORKER"):
+        return json.loads(json.dumps(fetch(), default=str))
+
+    from filelock import FileLock
+
+    cache_file = tmp_path_factory.getbasetemp().parent / f"{name}.json"
+    with FileLock(f"{cache_file}.lock"):
+        if not cache_file.is_file():
+            cache_file.write_text(json.dumps(fetch(), default=str))
+        return json.loads(cache_file.read_text())
+
+
+def prefetch_concurrently(calls):
+    """
+    Run independent AWS describe calls in a thread pool.
+
+    Returns a dict of futures keyed like `calls`; fixtures call .result() so an
+    error surfaces only in the tests that depend on that resource.
+    """
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return {key: executor.submit(fn) for key, fn in calls.items()}
+
+
+def collect_actions(policy_doc):
+    """Set of actions granted by Allow statements in an IAM policy document."""
+    statements = policy_doc.get("Statement", [])
+    if isinstance(statements, dict):
+        statements = [statements]
+
+    actions = set()
+    for statement in statements:
+        if statement.get("Effect") != "Allow":
+            continue
+        action = statement.get("Action", [])
+        actions.update([action] if isinstance(action, str) else action)
+    return actions
+
+
+def list_inline_policy_names(iam_client, role_name):
+    """All inline policy names on a role, following IsTruncated via the paginator."""
+    paginator = iam_client.get_paginator("list_role_policies")
+    return [
+        name
+        for page in paginator.paginate(RoleName=role_name, PaginationConfig={"PageSize": 100})
+        for name in page["PolicyNames"]
+    ]
+
+
+def _as_list(value):
+    """Normalize an IAM policy field that may be a single value, a list, or absent."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def trusted_services(trust_policy):
+    """Set of service principals allowed to assume a role."""
+    return {
+        service
+        for statement in _as_list(trust_policy.get("Statement"))
+        if isinstance(statement.get("Principal"), dict)
+        for service in _as_list(statement["Principal"].get("Service"))
+    }
+
+
+def granted_actions(patterns, candidates):
+    """Subset of candidate actions matched by any action pattern (wildcards, case-insensitive)."""
+    matcher = re.compile("|".join(fnmatch.translate(p.lower()) for p in patterns) or r"(?!)")
+    return frozenset(a for a in candidates if matcher.match(a.lower()))
+
+
+# Redshift Data API helpers
+def wait_for_statement(client, statement_id, wait_seconds=30):
+    """Poll a Data API statement (or batch) until it finishes."""
+    # Exponential backoff (50ms, capped at 2s)
+    delay = 0.05
+    elapsed = 0.0
+    while elapsed < wait_seconds:
+        status_response = client.describe_statement(Id=statement_id)
+        status = status_response["Status"]
+
+        if status == "FINISHED":
+            return status_response
+        elif status in ["FAILED", "ABORTED"]:
+            error = status_response.get("Error", "Unknown error")
+            raise Exception(f"Query failed: {error}")
+
+        sleep_for = min(delay, wait_seconds - elapsed)
+        time.sleep(sleep_for)
+        elapsed += sleep_for
+        delay = min(delay * 1.7, 2.0)
+
+    raise TimeoutError(f"Query did not complete in {wait_seconds} seconds")
+
+
+def execute_redshift_query(client, workgroup, database, sql, wait_seconds=30):
+    """Execute a query and wait for results."""
+    response = client.execute_statement(
+        WorkgroupName=workgroup,
+        Database=database,
+        Sql=sql
+    )
+    statement_id = response["Id"]
+    return statement_id, wait_for_statement(client, statement_id, wait_seconds)
+
+
+def execute_redshift_batch(client, workgroup, database, sqls, wait_seconds=60):
+    """Execute several queries as one batch and return their sub-statement IDs."""
+    response = client.batch_execute_statement(
+        WorkgroupName=workgroup,
+        Database=database,
+        Sqls=sqls
+    )
+    batch_id = response["Id"]
+    wait_for_statement(client, batch_id, wait_seconds)
+    # Sub-statement IDs are the batch ID suffixed with :1, :2, ...
+    return [f"{batch_id}:{i}" for i in range(1, len(sqls) + 1)]
 
 
 # Stack output helpers
-def get_stack_outputs(cf_client, stack_name):
-    """Get outputs from a CloudFormation stack as a dictionary."""
-    try:
-        response = cf_client.describe_stacks(StackName=stack_name)
-        outputs = response["Stacks"][0].get("Outputs", [])
-        return {o["OutputKey"]: o["OutputValue"] for o in outputs}
-    except cf_client.exceptions.ClientError:
-        return {}
+def get_stack_outputs(stacks, stack_name):
+    """Get outputs from a CloudFormation stack (in `all_stacks`) as a dictionary."""
+    outputs = stacks.get(stack_name, {}).get("Outputs", [])
+    return {o["OutputKey"]: o["OutputValue"] for o in outputs}
 
 
-def get_stack_status(cf_client, stack_name):
-    """Get status of a CloudFormation stack."""
-    try:
-        response = cf_client.describe_stacks(StackName=stack_name)
-        return response["Stacks"][0]["StackStatus"]
-    except cf_client.exceptions.ClientError:
-        return None
+def get_stack_status(stacks, stack_name):
+    """Get status of a CloudFormation stack (in `all_stacks`), or None if not deployed."""
+    return stacks.get(stack_name, {}).get("StackStatus")
 
 
 @pytest.fixture(scope="session")
-def kms_stack_outputs(cloudformation_client, environment_name):
+def all_stacks(aws_backend, cloudformation_client, tmp_path_factory):
+    """Every CloudFormation stack in the region by name, from one paginated describe_stacks."""
+    if aws_backend.stacks is not None:
+        return aws_backend.stacks
+
+    def fetch():
+        paginator = cloudformation_client.get_paginator("describe_stacks")
+        return {
+            stack["StackName"]: stack
+            for page in paginator.paginate()
+            for stack in page["Stacks"]
+        }
+
+    return cached_across_workers(tmp_path_factory, "cloudformation-stacks", fetch)
+
+
+
+@pytest.fixture(scope="session")
+def kms_stack_outputs(all_stacks, environment_name):
     """Outputs from KMS stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-kms")
+    return get_stack_outputs(all_stacks, f"{environment_name}-kms")
 
 
 @pytest.fixture(scope="session")
-def networking_stack_outputs(cloudformation_client, environment_name):
+def networking_stack_outputs(all_stacks, environment_name):
     """Outputs from networking stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-networking")
+    return get_stack_outputs(all_stacks, f"{environment_name}-networking")
 
 
 @pytest.fixture(scope="session")
-def security_stack_outputs(cloudformation_client, environment_name):
+def security_stack_outputs(all_stacks, environment_name):
     """Outputs from security stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-security")
+    return get_stack_outputs(all_stacks, f"{environment_name}-security")
 
 
 @pytest.fixture(scope="session")
-def storage_stack_outputs(cloudformation_client, environment_name):
+def storage_stack_outputs(all_stacks, environment_name):
     """Outputs from storage-ingestion stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-storage-ingestion")
+    return get_stack_outputs(all_stacks, f"{environment_name}-storage-ingestion")
 
 
 @pytest.fixture(scope="session")
-def processing_stack_outputs(cloudformation_client, environment_name):
+def processing_stack_outputs(all_stacks, environment_name):
     """Outputs from processing stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-processing")
+    return get_stack_outputs(all_stacks, f"{environment_name}-processing")
 
 
 @pytest.fixture(scope="session")
-def redshift_stack_outputs(cloudformation_client, environment_name):
+def redshift_stack_outputs(all_stacks, environment_name):
     """Outputs from redshift stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-redshift")
+    return get_stack_outputs(all_stacks, f"{environment_name}-redshift")
 
 
 @pytest.fixture(scope="session")
-def compliance_stack_outputs(cloudformation_client, environment_name):
+def compliance_stack_outputs(all_stacks, environment_name):
     """Outputs from compliance stack."""
-    return get_stack_outputs(cloudformation_client, f"{environment_name}-compliance")
+    return get_stack_outputs(all_stacks, f"{environment_name}-compliance")
+
+
+@pytest.fixture(scope="session")
+def firehose_stream_description(firehose_client, environment_name, tmp_path_factory):
+    """DeliveryStreamDescription of the ingestion Firehose stream."""
+    stream_name = f"{environment_name}-delivery-stream"
+    return cached_across_workers(
+        tmp_path_factory,
+        stream_name,
+        lambda: firehose_client.describe_delivery_stream(
+            DeliveryStreamName=stream_name
+        )["DeliveryStreamDescription"]
+    )
+
+
+@pytest.fixture(scope="session")
+def glue_resources(glue_client, iam_client, environment_name, glue_job_name):
+    """Phase 2 Glue/IAM lookups, fetched concurrently (dict of futures)."""
+    role_name = f"{environment_name}-glue-etl-role"
+
+    def inline_policies():
+        return {
+            n: iam_client.get_role_policy(RoleName=role_name, PolicyName=n)["PolicyDocument"]
+            for n in list_inline_policy_names(iam_client, role_name)
+        }
+
+    return prefetch_concurrently({
+        "job": lambda: glue_client.get_job(JobName=glue_job_name)["Job"],
+        "database": lambda: glue_client.get_database(Name=f"{environment_name}_db")["Database"],
+        "crawler": lambda: glue_client.get_crawler(Name=f"{environment_name}-curated-crawler")["Crawler"],
+        "role": lambda: iam_client.get_role(RoleName=role_name)["Role"],
+        "attached_policies": lambda: iam_client.list_attached_role_policies(
+            RoleName=role_name
+        )["AttachedPolicies"],
+        "inline_policies": inline_policies,
+    })
+
+
+@pytest.fixture(scope="session")
+def glue_job_response(glue_resources):
+    """Glue ETL job definition (get_job)."""
+    return glue_resources["job"].result()
+
+
+@pytest.fixture(scope="session")
+def glue_database(glue_resources):
+    """Glue Data Catalog database (get_database)."""
+    return glue_resources["database"].result()
+
+
+@pytest.fixture(scope="session")
+def glue_crawler(glue_resources):
+    """Glue curated data crawler (get_crawler)."""
+    return glue_resources["crawler"].result()
+
+
+@pytest.fixture(scope="session")
+def glue_role_bundle(glue_resources):
+    """Glue ETL role with its attached policies."""
+    return SimpleNamespace(
+        role=glue_resources["role"].result(),
+        attached=glue_resources["attached_policies"].result()
+    )
+
+
+@pytest.fixture(scope="session")
+def glue_role_actions(glue_resources):
+    """Actions allowed by the Glue ETL role's inline policies."""
+    return set().union(*[
+        collect_actions(doc) for doc in glue_resources["inline_policies"].result().values()
+    ])
+
+
+@pytest.fixture(scope="session")
+def glue_scripts(s3_client, processing_stack_outputs):
+    """Objects under scripts/ in the Glue scripts bucket, keyed by S3 key."""
+    bucket_name = processing_stack_outputs.get("GlueScriptsBucketName")
+    response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix="scripts/")
+    return {o["Key"]: o for o in response.get("Contents", [])}
+
+
+@pytest.fixture(scope="session")
+def security_groups(ec2_client, environment_name):
+    """
+    Glue connection and Redshift security groups from one describe call.
+
+    Keyed by both GroupId and Name tag. Values within one filter are ORed, so a
+    single tag:Name filter matches both groups.
+    """
+    response = ec2_client.describe_security_groups(Filters=[{
+        "Name": "tag:Name",
+        "Values": [f"{environment_name}-glue-connection-sg", f"{environment_name}-redshift-sg"]
+    }])
+    groups = {}
+    for sg in response["SecurityGroups"]:
+        groups[sg["GroupId"]] = sg
+        for tag in sg.get("Tags", []):
+            if tag["Key"] == "Name":
+                groups[tag["Value"]] = sg
+    return groups
+
+
+@pytest.fixture(scope="session")
+def role_policy_actions(iam_client):
+    """
+    Memoized lookup of the actions allowed by a role's inline policies.
+
+    Call with a role name; each role's policies are downloaded once per session.
+    """
+    cache = {}
+
+    def _get(role_name):
+        if role_name not in cache:
+            cache[role_name] = set().union(*[
+                collect_actions(
+                    iam_client.get_role_policy(RoleName=role_name, PolicyName=n)["PolicyDocument"]
+                )
+                for n in list_inline_policy_names(iam_client, role_name)
+            ])
+        return cache[role_name]
+
+    return _get
+
+
+@pytest.fixture(scope="session")
+def aws_resource_bundle(
+    dynamodb_client,
+    lambda_client,
+    athena_client,
+    redshift_serverless_client,
+    glue_client,
+    iam_client,
+    environment_name,
+    workgroup_name
+):
+    """Phase 3/4 describe calls, fetched concurrently (dict of futures)."""
+    function_name = f"{environment_name}-erasure-handler"
+    return prefetch_concurrently({
+        "gdpr_table": lambda: dynamodb_client.describe_table(
+            TableName=f"{environment_name}-gdpr-requests"
+        )["Table"],
+        "erasure_lambda": lambda: lambda_client.get_function(
+            FunctionName=function_name
+        )["Configuration"],
+        "event_source_mappings": lambda: lambda_client.list_event_source_mappings(
+            FunctionName=function_name
+        )["EventSourceMappings"],
+        "athena_workgroup": lambda: athena_client.get_work_group(
+            WorkGroup=f"{environment_name}-erasure-workgroup"
+        )["WorkGroup"],
+        "redshift_namespace": lambda: redshift_serverless_client.get_namespace(
+            namespaceName=f"{environment_name}-namespace"
+        )["namespace"],
+        "redshift_workgroup": lambda: redshift_serverless_client.get_workgroup(
+            workgroupName=workgroup_name
+        )["workgroup"],
+        "glue_redshift_connection": lambda: glue_client.get_connection(
+            Name=f"{environment_name}-redshift-connection"
+        )["Connection"],
+        "redshift_s3_role": lambda: iam_client.get_role(
+            RoleName=f"{environment_name}-redshift-s3-role"
+        )["Role"],
+        "erasure_role": lambda: iam_client.get_role(
+            RoleName=f"{environment_name}-erasure-handler-role"
+        )["Role"],
+    })
+
+
+@pytest.fixture(scope="session")
+def redshift_namespace(aws_resource_bundle):
+    """Redshift Serverless namespace (get_namespace)."""
+    return aws_resource_bundle["redshift_namespace"].result()
+
+
+@pytest.fixture(scope="session")
+def redshift_workgroup(aws_resource_bundle):
+    """Redshift Serverless workgroup (get_workgroup)."""
+    return aws_resource_bundle["redshift_workgroup"].result()
+
+
+@pytest.fixture(scope="session")
+def glue_redshift_connection(aws_resource_bundle):
+    """Glue JDBC connection to Redshift (get_connection)."""
+    return aws_resource_bundle["glue_redshift_connection"].result()
+
+
+@pytest.fixture(scope="session")
+def redshift_s3_role(aws_resource_bundle):
+    """Redshift S3 access IAM role (get_role)."""
+    return aws_resource_bundle["redshift_s3_role"].result()
+
+
+@pytest.fixture(scope="session")
+def gdpr_table(aws_resource_bundle):
+    """GDPR requests DynamoDB table (describe_table)."""
+    return aws_resource_bundle["gdpr_table"].result()
+
+
+@pytest.fixture(scope="session")
+def erasure_lambda(aws_resource_bundle):
+    """Erasure handler Lambda configuration (get_function)."""
+    return aws_resource_bundle["erasure_lambda"].result()
+
+
+@pytest.fixture(scope="session")
+def erasure_role_actions(role_policy_actions, environment_name):
+    """Actions allowed by the erasure handler role's inline policies."""
+    return role_policy_actions(f"{environment_name}-erasure-handler-role")
+
+
+@pytest.fixture(scope="session")
+def erasure_lambda_env_keys(erasure_lambda):
+    """Names of the erasure handler's environment variables."""
+    return frozenset(erasure_lambda.get("Environment", {}).get("Variables", {}))
+
+
+@pytest.fixture(scope="session")
+def erasure_esm(aws_resource_bundle):
+    """Event source mappings of the erasure handler (list_event_source_mappings)."""
+    return aws_resource_bundle["event_source_mappings"].result()
+
+
+@pytest.fixture(scope="session")
+def erasure_athena_workgroup(aws_resource_bundle):
+    """Erasure Athena workgroup (get_work_group)."""
+    return aws_resource_bundle["athena_workgroup"].result()
+
+
+@pytest.fixture(scope="session")
+def erasure_role(aws_resource_bundle):
+    """Erasure handler IAM role (get_role)."""
+    return aws_resource_bundle["erasure_role"].result()
+
+
+def find_log_group(logs_client, log_group_name):
+    """
+    Log group with exactly this name, or None.
+
+    Other groups can share the prefix (e.g. "-handler-dlq"), so pages are
+    scanned until the exact name turns up instead of trusting the first page.
+    """
+    paginator = logs_client.get_paginator("describe_log_groups")
+    pages = paginator.paginate(
+        logGroupNamePrefix=log_group_name,
+        PaginationConfig={"PageSize": 50}
+    )
+    for page in pages:
+        for log_group in page["logGroups"]:
+            if log_group["logGroupName"] == log_group_name:
+                return log_group
+    return None
+
+
+@pytest.fixture(scope="session")
+def env_alarms(cloudwatch_client, environment_name):
+    """Every metric alarm of the environment by name, from one paginated describe_alarms."""
+    paginator = cloudwatch_client.get_paginator("describe_alarms")
+    return {
+        alarm["AlarmName"]: alarm
+        for page in paginator.paginate(AlarmNamePrefix=f"{environment_name}-")
+        for alarm in page["MetricAlarms"]
+    }
+
+
+@pytest.fixture(scope="session")
+def cw_state(logs_client, env_alarms, environment_name):
+    """
+    Erasure handler CloudWatch state as {"log_group": ..., "alarm": ...}.
+
+    Built from one describe_log_groups scan and the shared env_alarms lookup;
+    either value is None when the resource is missing.
+    """
+    return {
+        "log_group": find_log_group(logs_client, f"/aws/lambda/{environment_name}-erasure-handler"),
+        "alarm": env_alarms.get(f"{environment_name}-erasure-failures")
+    }
+
+
+# Interface/gateway endpoints the erasure Lambda needs inside the VPC
+ERASURE_ENDPOINT_SERVICES = ("dynamodb", "athena", "redshift-data")
+
+
+@pytest.fixture(scope="session")
+def vpc_id(networking_stack_outputs):
+    """ID of the pipeline VPC from the networking stack outputs."""
+    vpc_id = networking_stack_outputs.get("VpcId")
+    assert vpc_id, "VpcId not found in networking outputs"
+    return vpc_id
+
+
+def find_vpc_endpoints(ec2_client, vpc_id, service_names):
+    """
+    One endpoint per service name in the VPC as {service_name: endpoint | None}.
+
+    Pages through describe_vpc_endpoints so nothing past the first page is
+    missed, keeping the first "available" endpoint of each service (or any
+    endpoint if none is available), and stops once every service has an
+    available one.
+    """
+    found = dict.fromkeys(service_names)
+    paginator = ec2_client.get_paginator("describe_vpc_endpoints")
+    pages = paginator.paginate(
+        Filters=[
+            {"Name": "vpc-id", "Values": [vpc_id]},
+            {"Name": "service-name", "Values": list(service_names)}
+        ],
+        PaginationConfig={"PageSize": 20}
+    )
+    for page in pages:
+        for endpoint in page["VpcEndpoints"]:
+            current = found.get(endpoint["ServiceName"])
+            if current is None or (current["State"] != "available" and endpoint["State"] == "available"):
+                found[endpoint["ServiceName"]] = endpoint
+        if all(ep is not None and ep["State"] == "available" for ep in found.values()):
+            break
+    return found
+
+
+@pytest.fixture(scope="session")
+def vpc_endpoints_by_service(ec2_client, vpc_id, aws_region):
+    """Erasure service VPC endpoints as {service_name: endpoint | None}, from one paginated scan."""
+    service_names = [f"com.amazonaws.{aws_region}.{svc}" for svc in ERASURE_ENDPOINT_SERVICES]
+    return find_vpc_endpoints(ec2_client, vpc_id, service_names)
+
+
+# Column introspection for patient_vitals. Run on its own rather than in the
+# session batch: a batch fails as a whole, and a missing column or table must
+# surface as a schema assertion, not as a failed dq/sample query.
+PATIENT_VITALS_SCHEMA_QUERY = """
+    SELECT column_name, data_type, character_maximum_length
+    FROM information_schema.columns
+    WHERE table_schema = 'patient_data'
+    AND table_name = 'patient_vitals'
+    ORDER BY ordinal_position
+"""
+
+# Read-only Redshift queries on patient_vitals shared by the Phase 3 tests,
+# submitted as one batch
+REDSHIFT_SESSION_QUERIES = {
+    "dq": """
+        SELECT
+            SUM(CASE WHEN heart_rate < 0 OR heart_rate > 300 THEN 1 ELSE 0 END) AS bad_hr,
+            SUM(CASE WHEN patient_id_hash IS NULL THEN 1 ELSE 0 END) AS null_hash,
+            SUM(CASE WHEN year IS NULL OR month IS NULL OR day IS NULL THEN 1 ELSE 0 END) AS null_partition,
+            COUNT(record_id) - COUNT(DISTINCT record_id) AS dup_records
+        FROM patient_data.patient_vitals
+    """,
+    "count": "SELECT COUNT(*) FROM patient_data.patient_vitals",
+    "sample": "SELECT patient_id_hash, heart_rate FROM patient_data.patient_vitals LIMIT 1",
+    "hashes": "SELECT patient_id_hash FROM patient_data.patient_vitals LIMIT 100",
+}
+
+
+@pytest.fixture(scope="session")
+def redshift_session_results(redshift_data_client, workgroup_name):
+    """get_statement_result() for each REDSHIFT_SESSION_QUERIES entry, run in one batch."""
+    sub_statement_ids = execute_redshift_batch(
+        redshift_data_client,
+        workgroup_name,
+        "healthcare_analytics",
+        list(REDSHIFT_SESSION_QUERIES.values())
+    )
+    return {
+        key: redshift_data_client.get_statement_result(Id=sub_id)
+        for key, sub_id in zip(REDSHIFT_SESSION_QUERIES, sub_statement_ids)
+    }
+
+
+@pytest.fixture(scope="session")
+def patient_vitals_schema(redshift_data_client, workgroup_name):
+    """
+    Columns of patient_data.patient_vitals as {column_name: (data_type, max_length)}.
+
+    One information_schema query covers table and column checks.
+    """
+    statement_id, _ = execute_redshift_query(
+        redshift_data_client,
+        workgroup_name,
+        "healthcare_analytics",
+        PATIENT_VITALS_SCHEMA_QUERY
+    )
+    result = redshift_data_client.get_statement_result(Id=statement_id)
+    return {
+        r[0]["stringValue"]: (r[1]["stringValue"], r[2].get("longValue", 0))
+        for r in result.get("Records", [])
+    }
+
+
+@pytest.fixture(scope="session")
+def dq_counts(redshift_session_results):
+    """
+    Data quality violation counts for patient_vitals from one table scan.
+
+    Keys: bad_hr, null_hash, null_partition, dup_records.
+    """
+    result = redshift_session_results["dq"]
+    names = [c["name"] for c in result["ColumnMetadata"]]
+    # SUM() over an empty table is NULL, reported as {"isNull": True}
+    return {name: field.get("longValue", 0) for name, field in zip(names, result["Records"][0])}
+
+
+@pytest.fixture(scope="session")
+def patient_vitals_row_count(redshift_session_results):
+    """Row count of patient_data.patient_vitals."""
+    records = redshift_session_results["count"].get("Records", [])
+    assert len(records) > 0, "Query returned no results"
+    return records[0][0].get("longValue", 0)
+
+
+@pytest.fixture(scope="session")
+def patient_vitals_sample(redshift_session_results):
+    """get_statement_result() of a small sample query on patient_vitals."""
+    return redshift_session_results["sample"]
+
+
+@pytest.fixture(scope="session")
+def patient_id_hashes(redshift_session_results):
+    """Up to 100 patient_id_hash values from patient_vitals."""
+    return [
+        record[0].get("stringValue", "")
+        for record in redshift_session_results["hashes"].get("Records", [])
+    ]
+
+
+def pytest_addoption(parser):
+    """Add the --offline switch for moto-backed unit runs and the --use-aws-cache switch."""
+    parser.addoption(
+        "--offline",
+        action="store_true",
+        default=os.environ.get("AWS_TEST_MODE", "live") == "unit",
+        help="Run only tests marked 'unit' against moto instead of real AWS "
+             "(default when AWS_TEST_MODE=unit)"
+    )
+    parser.addoption(
+        "--use-aws-cache",
+        action="store_true",
+        default=False,
+        help="Replay VPC endpoint, log group and alarm describe calls from "
+             ".cache/aws-describe.pickle (12-hour TTL) for quick local re-runs"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """In --offline mode, skip everything that needs deployed infrastructure."""
+    if not config.getoption("--offline"):
+        return
+    skip_online = pytest.mark.skip(reason="requires real AWS (not marked 'unit')")
+    for item in items:
+        if "unit" not in item.keywords:
+            item.add_marker(skip_online)
 
 
 # Pytest markers for phase selection
@@ -208,3 +951,5 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "phase4: Phase 4 - GDPR compliance tests")
     config.addinivalue_line("markers", "integration: Integration tests requiring deployed infrastructure")
     config.addinivalue_line("markers", "slow: Slow-running tests")
+    config.addinivalue_line("markers", "unit: Runs offline (pure logic or moto-backed) with --offline")
+    config.addinivalue_line("markers", "xdist_group(name): Run tests in the same pytest-xdist worker")
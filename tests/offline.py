@@ -0,0 +1,342 @@
+"""
+GDPR Healthcare Pipeline - Offline Fixtures
+
+Seeds moto's in-memory AWS backend with the networking VPC endpoints, the
+Phase 2 processing resources and the Phase 4 compliance resources, so tests
+marked `unit` can run with `pytest --offline` (or AWS_TEST_MODE=unit) and no
+network access or credentials.
+
+Properties and policy documents are read from infrastructure/networking.yaml,
+processing.yaml and compliance.yaml, with their intrinsic functions resolved
+against the seeded resources, so the unit tests check what the templates
+declare.
+"""
+
+import io
+import json
+import re
+import zipfile
+from pathlib import Path
+
+import yaml
+
+ACCOUNT_ID = "123456789012"
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "infrastructure"
+
+INTRINSIC_TAGS = ("Ref", "Sub", "GetAtt", "Join", "Select", "Split", "ImportValue")
+
+
+class TemplateLoader(yaml.SafeLoader):
+    """SafeLoader that reads CloudFormation short-form tags as their long-form dicts."""
+
+
+def construct_intrinsic(loader, node):
+    """Turn `!Sub x` into {"Fn::Sub": x}, `!Ref x` into {"Ref": x} and `!GetAtt A.B` into {"Fn::GetAtt": [A, B]}."""
+    tag = node.tag[1:]
+    if isinstance(node, yaml.ScalarNode):
+        value = loader.construct_scalar(node)
+        if tag == "GetAtt":
+            value = value.split(".", 1)
+    elif isinstance(node, yaml.SequenceNode):
+        value = loader.construct_sequence(node, deep=True)
+    else:
+        value = loader.construct_mapping(node, deep=True)
+    return {"Ref" if tag == "Ref" else f"Fn::{tag}": value}
+
+
+for _tag in INTRINSIC_TAGS:
+    TemplateLoader.add_constructor(f"!{_tag}", construct_intrinsic)
+
+
+def load_template(name):
+    """Parse infrastructure/<name>.yaml."""
+    with open(TEMPLATE_DIR / f"{name}.yaml") as handle:
+        return yaml.load(handle, Loader=TemplateLoader)
+
+
+def resolve(node, refs):
+    """
+    Replace intrinsic functions in a template fragment with seeded values.
+
+    `refs` maps parameters and logical IDs (Ref), "LogicalId.Attribute"
+    (GetAtt and ${LogicalId.Attribute}) and export names (ImportValue).
+    """
+    if isinstance(node, list):
+        return [resolve(item, refs) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if len(node) == 1:
+        (function, value), = node.items()
+        if function == "Ref":
+            return refs[value]
+        if function == "Fn::GetAtt":
+            return refs[".".join(value)]
+        if function == "Fn::ImportValue":
+            return refs[resolve(value, refs)]
+        if function == "Fn::Sub":
+            text, variables = (value, {}) if isinstance(value, str) else value
+            scope = {**refs, **resolve(variables, refs)}
+            return re.sub(r"\$\{([^}]+)\}", lambda match: scope[match.group(1)], text)
+        if function == "Fn::Join":
+            delimiter, items = value
+            return delimiter.join(resolve(items, refs))
+        if function == "Fn::Split":
+            delimiter, text = value
+            return resolve(text, refs).split(delimiter)
+        if function == "Fn::Select":
+            index, items = value
+            return resolve(items, refs)[int(index)]
+    return {key: resolve(item, refs) for key, item in node.items()}
+
+
+def resources_of_type(template, resource_type, refs):
+    """Yield (logical_id, resolved Properties) for each resource of a type, resolving lazily so earlier refs apply."""
+    for logical_id, resource in template["Resources"].items():
+        if resource["Type"] == resource_type:
+            yield logical_id, resolve(resource.get("Properties", {}), refs)
+
+
+def resource_properties(template, logical_id, refs):
+    """Resolved Properties of one template resource."""
+    return resolve(template["Resources"][logical_id].get("Properties", {}), refs)
+
+
+def stack_outputs(template, refs):
+    """Resolve a template's Outputs into ({OutputKey: value}, {export name: value})."""
+    outputs, exports = {}, {}
+    for key, output in template.get("Outputs", {}).items():
+        outputs[key] = resolve(output["Value"], refs)
+        if "Export" in output:
+            exports[resolve(output["Export"]["Name"], refs)] = outputs[key]
+    return outputs, exports
+
+
+def seed_resources(session, environment_name, region):
+    """
+    Create every resource the offline (`unit`) tests read.
+
+    Returns stand-in describe_stacks records keyed by stack name, since the
+    stacks themselves are not deployed through CloudFormation offline.
+    """
+    refs = {"EnvironmentName": environment_name, "AWS::Region": region, "AWS::AccountId": ACCOUNT_ID}
+    refs.update(seed_upstream_exports(session, environment_name, region))
+
+    networking_outputs, networking_exports = seed_networking_resources(session, refs)
+    refs.update(networking_exports)
+    refs.update(seed_processing_resources(session, refs))
+    seed_compliance_resources(session, refs)
+    return {
+        f"{environment_name}-networking": stack_record(f"{environment_name}-networking", networking_outputs)
+    }
+
+
+def stack_record(stack_name, outputs):
+    """A describe_stacks entry for a seeded stack with the given outputs."""
+    return {
+        "StackName": stack_name,
+        "StackStatus": "CREATE_COMPLETE",
+        "Outputs": [{"OutputKey": key, "OutputValue": value} for key, value in outputs.items()]
+    }
+
+
+def seed_upstream_exports(session, environment_name, region):
+    """Exports of the KMS, security, storage and Redshift stacks, which are not seeded beyond a moto KMS key."""
+    kms = session.client("kms", region_name=region)
+    key_arn = kms.create_key(Description=f"{environment_name} offline key")["KeyMetadata"]["Arn"]
+
+    raw_bucket = f"{environment_name}-raw-{ACCOUNT_ID}"
+    curated_bucket = f"{environment_name}-curated-{ACCOUNT_ID}"
+    exports = {
+        "KmsKeyArn": key_arn,
+        "HashingSaltSecretArn": f"arn:aws:secretsmanager:{region}:{ACCOUNT_ID}:secret:{environment_name}/hashing-salt",
+        "RawBucketName": raw_bucket,
+        "RawBucketArn": f"arn:aws:s3:::{raw_bucket}",
+        "CuratedBucketName": curated_bucket,
+        "CuratedBucketArn": f"arn:aws:s3:::{curated_bucket}",
+        "RedshiftWorkgroupName": f"{environment_name}-workgroup",
+        "RedshiftS3RoleArn": f"arn:aws:iam::{ACCOUNT_ID}:role/{environment_name}-redshift-s3-role",
+        "GlueConnectionName": f"{environment_name}-redshift-connection"
+    }
+    return {f"{environment_name}-{name}": value for name, value in exports.items()}
+
+
+def tag_specifications(resource_type, props):
+    """EC2 TagSpecifications for a resource's CloudFormation Tags."""
+    return [{"ResourceType": resource_type, "Tags": props.get("Tags", [])}]
+
+
+def ip_permissions(rules):
+    """EC2 IpPermissions for CloudFormation SecurityGroupIngress/Egress rules."""
+    return [{
+        "IpProtocol": rule["IpProtocol"],
+        "FromPort": rule["FromPort"],
+        "ToPort": rule["ToPort"],
+        "IpRanges": [{"CidrIp": rule["CidrIp"], "Description": rule.get("Description", "")}]
+    } for rule in rules]
+
+
+def create_security_group(ec2, props):
+    """Create an AWS::EC2::SecurityGroup, named after its Name tag; returns the group ID."""
+    name = next(tag["Value"] for tag in props["Tags"] if tag["Key"] == "Name")
+    group_id = ec2.create_security_group(
+        GroupName=name,
+        Description=props["GroupDescription"],
+        VpcId=props["VpcId"],
+        TagSpecifications=tag_specifications("security-group", props)
+    )["GroupId"]
+    if props.get("SecurityGroupIngress"):
+        ec2.authorize_security_group_ingress(
+            GroupId=group_id, IpPermissions=ip_permissions(props["SecurityGroupIngress"])
+        )
+    if props.get("SecurityGroupEgress"):
+        ec2.authorize_security_group_egress(
+            GroupId=group_id, IpPermissions=ip_permissions(props["SecurityGroupEgress"])
+        )
+    return group_id
+
+
+def create_role(iam, props):
+    """Create an AWS::IAM::Role with its managed and inline policies; returns the role ARN."""
+    role_arn = iam.create_role(
+        RoleName=props["RoleName"],
+        AssumeRolePolicyDocument=json.dumps(props["AssumeRolePolicyDocument"]),
+        Tags=props.get("Tags", [])
+    )["Role"]["Arn"]
+    for policy_arn in props.get("ManagedPolicyArns", []):
+        iam.attach_role_policy(RoleName=props["RoleName"], PolicyArn=policy_arn)
+    for policy in props.get("Policies", []):
+        iam.put_role_policy(
+            RoleName=props["RoleName"],
+            PolicyName=policy["PolicyName"],
+            PolicyDocument=json.dumps(policy["PolicyDocument"])
+        )
+    return role_arn
+
+
+def seed_networking_resources(session, refs):
+    """Create the VPC, private subnets, route table and VPC endpoints of the networking stack."""
+    template = load_template("networking")
+    refs = dict(refs)
+    ec2 = session.client("ec2", region_name=refs["AWS::Region"])
+
+    for logical_id, props in resources_of_type(template, "AWS::EC2::VPC", refs):
+        refs[logical_id] = ec2.create_vpc(
+            CidrBlock=props["CidrBlock"],
+            TagSpecifications=tag_specifications("vpc", props)
+        )["Vpc"]["VpcId"]
+    for logical_id, props in resources_of_type(template, "AWS::EC2::Subnet", refs):
+        refs[logical_id] = ec2.create_subnet(
+            VpcId=props["VpcId"],
+            CidrBlock=props["CidrBlock"],
+            AvailabilityZone=props["AvailabilityZone"],
+            TagSpecifications=tag_specifications("subnet", props)
+        )["Subnet"]["SubnetId"]
+    for logical_id, props in resources_of_type(template, "AWS::EC2::RouteTable", refs):
+        refs[logical_id] = ec2.create_route_table(
+            VpcId=props["VpcId"],
+            TagSpecifications=tag_specifications("route-table", props)
+        )["RouteTable"]["RouteTableId"]
+    for _, props in resources_of_type(template, "AWS::EC2::SubnetRouteTableAssociation", refs):
+        ec2.associate_route_table(SubnetId=props["SubnetId"], RouteTableId=props["RouteTableId"])
+    for logical_id, props in resources_of_type(template, "AWS::EC2::SecurityGroup", refs):
+        refs[logical_id] = create_security_group(ec2, props)
+    for _, props in resources_of_type(template, "AWS::EC2::VPCEndpoint", refs):
+        ec2.create_vpc_endpoint(**props)
+
+    return stack_outputs(template, refs)
+
+
+def seed_processing_resources(session, refs):
+    """Create the Glue job, database, crawler and IAM role of the processing stack; returns its exports."""
+    template = load_template("processing")
+    refs = dict(refs)
+    region = refs["AWS::Region"]
+    iam = session.client("iam", region_name=region)
+    glue = session.client("glue", region_name=region)
+
+    for logical_id, bucket in (("QuarantineDataBucket", "quarantine"), ("GlueScriptsBucket", "glue-scripts")):
+        refs[logical_id] = f"{refs['EnvironmentName']}-{bucket}-{ACCOUNT_ID}"
+        refs[f"{logical_id}.Arn"] = f"arn:aws:s3:::{refs[logical_id]}"
+
+    refs["GlueJobRole.Arn"] = create_role(iam, resource_properties(template, "GlueJobRole", refs))
+
+    database = resource_properties(template, "HealthcareDatabase", refs)
+    glue.create_database(DatabaseInput=database["DatabaseInput"])
+    refs["HealthcareDatabase"] = database["DatabaseInput"]["Name"]
+
+    job = resource_properties(template, "HealthcareETLJob", refs)
+    glue.create_job(**job)
+    refs["HealthcareETLJob"] = job["Name"]
+
+    crawler = resource_properties(template, "CuratedDataCrawler", refs)
+    glue.create_crawler(**crawler)
+    refs["CuratedDataCrawler"] = crawler["Name"]
+
+    return stack_outputs(template, refs)[1]
+
+
+def seed_compliance_resources(session, refs):
+    """Create the DynamoDB table, Lambda, trigger, Athena workgroup, IAM role and monitoring of the compliance stack."""
+    template = load_template("compliance")
+    refs = dict(refs)
+    region = refs["AWS::Region"]
+    ec2 = session.client("ec2", region_name=region)
+    iam = session.client("iam", region_name=region)
+    dynamodb = session.client("dynamodb", region_name=region)
+    lambda_client = session.client("lambda", region_name=region)
+    athena = session.client("athena", region_name=region)
+    logs = session.client("logs", region_name=region)
+    cloudwatch = session.client("cloudwatch", region_name=region)
+
+    # CloudFormation's table properties differ from CreateTable's: PITR is a
+    # separate call, and SSE and stream settings use other key names.
+    table = resource_properties(template, "GdprRequestsTable", refs)
+    pitr = table.pop("PointInTimeRecoverySpecification")
+    sse = table.pop("SSESpecification")
+    table["StreamSpecification"]["StreamEnabled"] = True
+    description = dynamodb.create_table(
+        **table,
+        SSESpecification={
+            "Enabled": sse["SSEEnabled"],
+            "SSEType": sse["SSEType"],
+            "KMSMasterKeyId": sse["KMSMasterKeyId"]
+        }
+    )["TableDescription"]
+    dynamodb.update_continuous_backups(TableName=table["TableName"], PointInTimeRecoverySpecification=pitr)
+    refs["GdprRequestsTable"] = table["TableName"]
+    refs["GdprRequestsTable.Arn"] = description["TableArn"]
+    refs["GdprRequestsTable.StreamArn"] = description["LatestStreamArn"]
+
+    workgroup = resource_properties(template, "ErasureAthenaWorkgroup", refs)
+    athena.create_work_group(
+        Name=workgroup["Name"],
+        Configuration=workgroup["WorkGroupConfiguration"],
+        Tags=workgroup["Tags"]
+    )
+    refs["ErasureAthenaWorkgroup"] = workgroup["Name"]
+
+    refs["ErasureLambdaSecurityGroup"] = create_security_group(
+        ec2, resource_properties(template, "ErasureLambdaSecurityGroup", refs)
+    )
+    refs["ErasureHandlerRole.Arn"] = create_role(iam, resource_properties(template, "ErasureHandlerRole", refs))
+
+    log_group = resource_properties(template, "ErasureLogGroup", refs)
+    logs.create_log_group(logGroupName=log_group["LogGroupName"], kmsKeyId=log_group["KmsKeyId"])
+    logs.put_retention_policy(logGroupName=log_group["LogGroupName"], retentionInDays=log_group["RetentionInDays"])
+
+    # The template deploys the handler zip from the scripts bucket; offline a stub is uploaded inline.
+    code = io.BytesIO()
+    with zipfile.ZipFile(code, "w") as archive:
+        archive.writestr("erasure_handler.py", "def lambda_handler(event, context):\n    return None\n")
+
+    function = resource_properties(template, "ErasureHandlerFunction", refs)
+    function["Code"] = {"ZipFile": code.getvalue()}
+    function["Tags"] = {tag["Key"]: tag["Value"] for tag in function.get("Tags", [])}
+    lambda_client.create_function(**function)
+    refs["ErasureHandlerFunction"] = function["FunctionName"]
+
+    lambda_client.create_event_source_mapping(**resource_properties(template, "ErasureStreamTrigger", refs))
+
+    for _, alarm in resources_of_type(template, "AWS::CloudWatch::Alarm", refs):
+        cloudwatch.put_metric_alarm(**alarm)
@@ -12,9 +12,9 @@ from tests.conftest import get_stack_status
 class TestKMSStack:
     """Test KMS CloudFormation stack deployment."""
 
-    def test_kms_stack_exists(self, cloudformation_client, environment_name):
+    def test_kms_stack_exists(self, all_stacks, environment_name):
         """KMS stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-kms")
+        status = get_stack_status(all_stacks, f"{environment_name}-kms")
         assert status is not None, "KMS stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"KMS stack status: {status}"
 
@@ -12,9 +12,9 @@ from tests.conftest import get_stack_status
 class TestNetworkingStack:
     """Test networking CloudFormation stack deployment."""
 
-    def test_networking_stack_exists(self, cloudformation_client, environment_name):
+    def test_networking_stack_exists(self, all_stacks, environment_name):
         """Networking stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-networking")
+        status = get_stack_status(all_stacks, f"{environment_name}-networking")
         assert status is not None, "Networking stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Networking stack status: {status}"
 
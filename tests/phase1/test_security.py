@@ -6,16 +6,16 @@ Tests for IAM roles and Secrets Manager.
 
 import json
 import pytest
-from tests.conftest import get_stack_status
+from tests.conftest import get_stack_status, granted_actions, trusted_services
 
 
 @pytest.mark.phase1
 class TestSecurityStack:
     """Test security CloudFormation stack deployment."""
 
-    def test_security_stack_exists(self, cloudformation_client, environment_name):
+    def test_security_stack_exists(self, all_stacks, environment_name):
         """Security stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-security")
+        status = get_stack_status(all_stacks, f"{environment_name}-security")
         assert status is not None, "Security stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Security stack status: {status}"
 
@@ -45,46 +45,19 @@ class TestFirehoseRole:
         response = iam_client.get_role(RoleName=role_name)
 
         trust_policy = response["Role"]["AssumeRolePolicyDocument"]
-        principals = []
-        for statement in trust_policy.get("Statement", []):
-            principal = statement.get("Principal", {})
-            if isinstance(principal.get("Service"), str):
-                principals.append(principal["Service"])
-            elif isinstance(principal.get("Service"), list):
-                principals.extend(principal["Service"])
+        principals = trusted_services(trust_policy)
 
         assert "firehose.amazonaws.com" in principals, "Firehose service not in trust policy"
 
-    def test_firehose_role_has_s3_permissions(self, iam_client, environment_name):
-        """Firehose role should have S3 permissions."""
-        role_name = f"{environment_name}-firehose-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        # Check inline policies for S3 actions
-        has_s3 = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "s3:" in policy_str:
-                has_s3 = True
-                break
-
-        assert has_s3, "Firehose role missing S3 permissions"
-
-    def test_firehose_role_has_kms_permissions(self, iam_client, environment_name):
-        """Firehose role should have KMS permissions."""
-        role_name = f"{environment_name}-firehose-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        has_kms = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "kms:" in policy_str:
-                has_kms = True
-                break
+    def test_firehose_role_has_s3_permissions(self, role_policy_actions, environment_name):
+        """Firehose role should be able to write delivered objects to S3."""
+        actions = role_policy_actions(f"{environment_name}-firehose-role")
+        assert granted_actions(actions, {"s3:PutObject"}), "Firehose role missing S3 permissions"
 
-        assert has_kms, "Firehose role missing KMS permissions"
+    def test_firehose_role_has_kms_permissions(self, role_policy_actions, environment_name):
+        """Firehose role should be able to generate KMS data keys."""
+        actions = role_policy_actions(f"{environment_name}-firehose-role")
+        assert granted_actions(actions, {"kms:GenerateDataKey"}), "Firehose role missing KMS permissions"
 
 
 @pytest.mark.phase1
@@ -4,17 +4,21 @@ Phase 1 Tests - Storage and Ingestion Configuration
 Tests for S3 buckets and Kinesis Firehose.
 """
 
+import re
 import pytest
 from tests.conftest import get_stack_status
 
+# Firehose prefix contains a date partition (Hive-style or timestamp namespace)
+DATE_PARTITION_PATTERN = re.compile(r"year=|!?\{timestamp:", re.IGNORECASE)
+
 
 @pytest.mark.phase1
 class TestStorageStack:
     """Test storage-ingestion CloudFormation stack deployment."""
 
-    def test_storage_stack_exists(self, cloudformation_client, environment_name):
+    def test_storage_stack_exists(self, all_stacks, environment_name):
         """Storage-ingestion stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-storage-ingestion")
+        status = get_stack_status(all_stacks, f"{environment_name}-storage-ingestion")
         assert status is not None, "Storage stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Storage stack status: {status}"
 
@@ -82,20 +86,14 @@ class TestRawDataBucket:
 class TestFirehoseDeliveryStream:
     """Test Kinesis Firehose configuration."""
 
-    def test_firehose_stream_exists(self, firehose_client, environment_name):
+    def test_firehose_stream_exists(self, firehose_stream_description):
         """Firehose delivery stream should exist."""
-        stream_name = f"{environment_name}-delivery-stream"
-        response = firehose_client.describe_delivery_stream(DeliveryStreamName=stream_name)
-
-        assert response["DeliveryStreamDescription"]["DeliveryStreamStatus"] == "ACTIVE", \
+        assert firehose_stream_description["DeliveryStreamStatus"] == "ACTIVE", \
             "Firehose stream is not active"
 
-    def test_firehose_destination_is_s3(self, firehose_client, environment_name):
+    def test_firehose_destination_is_s3(self, firehose_stream_description):
         """Firehose should deliver to S3."""
-        stream_name = f"{environment_name}-delivery-stream"
-        response = firehose_client.describe_delivery_stream(DeliveryStreamName=stream_name)
-
-        destinations = response["DeliveryStreamDescription"]["Destinations"]
+        destinations = firehose_stream_description["Destinations"]
         assert len(destinations) > 0, "No destinations configured"
 
         # Check for S3 destination
@@ -105,12 +103,9 @@ class TestFirehoseDeliveryStream:
         )
         assert has_s3, "No S3 destination found"
 
-    def test_firehose_uses_kms_encryption(self, firehose_client, environment_name, kms_stack_outputs):
+    def test_firehose_uses_kms_encryption(self, firehose_stream_description, kms_stack_outputs):
         """Firehose should use KMS encryption for S3 delivery."""
-        stream_name = f"{environment_name}-delivery-stream"
-        response = firehose_client.describe_delivery_stream(DeliveryStreamName=stream_name)
-
-        destinations = response["DeliveryStreamDescription"]["Destinations"]
+        destinations = firehose_stream_description["Destinations"]
         kms_key_arn = kms_stack_outputs.get("KmsKeyArn")
 
         for dest in destinations:
@@ -124,24 +119,15 @@ class TestFirehoseDeliveryStream:
 
         pytest.fail("KMS encryption not configured for Firehose S3 destination")
 
-    def test_firehose_partitions_by_date(self, firehose_client, environment_name):
+    def test_firehose_partitions_by_date(self, firehose_stream_description):
         """Firehose should partition data by date."""
-        stream_name = f"{environment_name}-delivery-stream"
-        response = firehose_client.describe_delivery_stream(DeliveryStreamName=stream_name)
-
-        destinations = response["DeliveryStreamDescription"]["Destinations"]
+        destinations = firehose_stream_description["Destinations"]
 
         for dest in destinations:
             s3_config = dest.get("ExtendedS3DestinationDescription", {})
             prefix = s3_config.get("Prefix", "")
 
-            # Check for date partitioning pattern
-            has_date_partition = (
-                "year=" in prefix.lower() or
-                "!{timestamp:" in prefix or
-                "{timestamp:" in prefix
-            )
-            if has_date_partition:
+            if DATE_PARTITION_PATTERN.search(prefix):
                 return
 
         pytest.fail("No date partitioning found in Firehose prefix")
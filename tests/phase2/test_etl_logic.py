@@ -7,6 +7,7 @@ Tests for pseudonymization, data validation, and ETL script.
 import hashlib
 import json
 import time
+from datetime import datetime, timezone
 import pytest
 
 
@@ -14,24 +15,19 @@ import pytest
 class TestGlueScriptDeployment:
     """Test Glue script is deployed correctly."""
 
-    def test_etl_script_exists_in_s3(self, s3_client, processing_stack_outputs):
+    def test_etl_script_exists_in_s3(self, glue_scripts):
         """ETL script should be uploaded to S3."""
-        bucket_name = processing_stack_outputs.get("GlueScriptsBucketName")
-        script_key = "scripts/etl_job.py"
+        assert "scripts/etl_job.py" in glue_scripts, "ETL script not found in S3"
 
-        response = s3_client.head_object(Bucket=bucket_name, Key=script_key)
-        assert response["ResponseMetadata"]["HTTPStatusCode"] == 200, "ETL script not found in S3"
-
-    def test_etl_script_not_empty(self, s3_client, processing_stack_outputs):
+    def test_etl_script_not_empty(self, glue_scripts):
         """ETL script should not be empty."""
-        bucket_name = processing_stack_outputs.get("GlueScriptsBucketName")
-        script_key = "scripts/etl_job.py"
-
-        response = s3_client.head_object(Bucket=bucket_name, Key=script_key)
-        assert response["ContentLength"] > 1000, "ETL script seems too small"
+        script = glue_scripts.get("scripts/etl_job.py")
+        assert script, "ETL script not found in S3"
+        assert script["Size"] > 1000, "ETL script seems too small"
 
 
 @pytest.mark.phase2
+@pytest.mark.unit
 class TestPseudonymizationLogic:
     """Test pseudonymization implementation (unit tests)."""
 
@@ -86,6 +82,7 @@ class TestPseudonymizationLogic:
 
 
 @pytest.mark.phase2
+@pytest.mark.unit
 class TestDataValidationLogic:
     """Test data validation rules (unit tests)."""
 
@@ -159,25 +156,17 @@ class TestDataValidationLogic:
 class TestGlueJobExecution:
     """Integration tests for Glue job execution."""
 
-    def test_glue_job_can_start(self, glue_client, environment_name):
+    def test_glue_job_can_start(self, glue_job_response):
         """Glue job should be able to start (dry run check)."""
-        job_name = f"{environment_name}-etl-job"
-
-        # Just verify the job exists and has valid configuration
-        response = glue_client.get_job(JobName=job_name)
-        job = response["Job"]
-
         # Verify all required arguments are present
-        args = job["DefaultArguments"]
+        args = glue_job_response["DefaultArguments"]
         assert "--RAW_BUCKET" in args, "Missing RAW_BUCKET argument"
         assert "--CURATED_BUCKET" in args, "Missing CURATED_BUCKET argument"
 
-    def test_glue_job_recent_run_succeeded(self, glue_client, environment_name):
+    def test_glue_job_recent_run_succeeded(self, glue_client, glue_job_name):
         """Check if most recent job run succeeded (if any runs exist)."""
-        job_name = f"{environment_name}-etl-job"
-
         try:
-            response = glue_client.get_job_runs(JobName=job_name, MaxResults=1)
+            response = glue_client.get_job_runs(JobName=glue_job_name, MaxResults=1)
             runs = response.get("JobRuns", [])
 
             if runs:
@@ -199,7 +188,14 @@ class TestDataFlowIntegration:
         """Curated bucket should have data after ETL run (if job has run)."""
         bucket_name = storage_stack_outputs.get("CuratedBucketName")
 
-        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix="curated/", MaxKeys=10)
+        # Look in today's partition first (the ETL job processes the current UTC day)
+        today = datetime.now(timezone.utc)
+        prefix = f"curated/year={today:%Y}/month={today:%m}/day={today:%d}/"
+        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix, MaxKeys=1)
+
+        if response.get("KeyCount", 0) == 0:
+            # Fall back to any partition
+            response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix="curated/", MaxKeys=10)
 
         # This is optional - may not have data yet
         if response.get("KeyCount", 0) > 0:
@@ -223,17 +219,25 @@ class TestDataFlowIntegration:
         else:
             pytest.skip("No data to check partitioning")
 
-    def test_curated_data_no_raw_patient_id(self, s3_client, storage_stack_outputs):
+    def test_curated_data_no_raw_patient_id(self, s3_client, storage_stack_outputs, aws_region):
         """Curated data should not contain raw patient_id column."""
-        # This would require reading Parquet files - simplified check
         bucket_name = storage_stack_outputs.get("CuratedBucketName")
 
-        # Check that data exists first
-        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix="curated/", MaxKeys=1)
+        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix="curated/", MaxKeys=100)
+        parquet_keys = [
+            obj["Key"] for obj in response.get("Contents", [])
+            if obj["Key"].endswith(".parquet")
+        ]
 
-        if response.get("KeyCount", 0) > 0:
-            # Note: Full validation would require reading Parquet schema
-            # This is a placeholder for that check
-            pass
-        else:
+        if not parquet_keys:
             pytest.skip("No curated data to validate")
+
+        pafs = pytest.importorskip("pyarrow.fs")
+        pq = pytest.importorskip("pyarrow.parquet")
+
+        # read_schema only fetches the Parquet footer, not the row groups
+        fs = pafs.S3FileSystem(region=aws_region)
+        schema = pq.read_schema(f"{bucket_name}/{parquet_keys[0]}", filesystem=fs)
+
+        assert "patient_id" not in schema.names, "Raw patient_id column found - GDPR violation!"
+        assert "patient_id_hash" in schema.names, "patient_id_hash column missing"
@@ -4,31 +4,67 @@ Phase 2 Tests - Glue Job Configuration
 Tests for Glue ETL job setup and IAM permissions.
 """
 
-import json
+import re
 import pytest
-from tests.conftest import get_stack_status
+from tests.conftest import get_stack_status, granted_actions, trusted_services
+
+REDSHIFT_CONNECTION_PATTERN = re.compile(r"redshift", re.IGNORECASE)
+
+REQUIRED_OUTPUTS = frozenset({
+    "GlueJobName",
+    "GlueDatabaseName",
+    "QuarantineBucketName",
+    "GlueScriptsBucketName"
+})
+
+# Tuples (not sets) so parametrized test IDs are ordered identically on every xdist worker
+REQUIRED_JOB_ARGS = (
+    "--RAW_BUCKET",
+    "--CURATED_BUCKET",
+    "--QUARANTINE_BUCKET",
+    "--SECRET_ARN",
+    "--KMS_KEY_ARN",
+    "--DATABASE_NAME",
+    "--TABLE_NAME"
+)
+
+# Phase 3 requirement
+REDSHIFT_JOB_ARGS = (
+    "--REDSHIFT_CONNECTION",
+    "--REDSHIFT_IAM_ROLE",
+    "--REDSHIFT_TEMP_DIR"
+)
+
+GLUE_ROLE_REQUIRED_ACTIONS = frozenset({
+    "s3:GetObject",
+    "s3:PutObject",
+    "kms:Decrypt",
+    "kms:Encrypt",
+    "secretsmanager:GetSecretValue",
+    "ec2:CreateNetworkInterface"
+})
+
+
+@pytest.fixture(scope="module")
+def glue_role_capabilities(glue_role_actions):
+    """Required actions the Glue role grants, resolved once against wildcards like s3:*."""
+    return granted_actions(glue_role_actions, GLUE_ROLE_REQUIRED_ACTIONS)
 
 
 @pytest.mark.phase2
 class TestProcessingStack:
     """Test processing CloudFormation stack deployment."""
 
-    def test_processing_stack_exists(self, cloudformation_client, environment_name):
+    def test_processing_stack_exists(self, all_stacks, environment_name):
         """Processing stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-processing")
+        status = get_stack_status(all_stacks, f"{environment_name}-processing")
         assert status is not None, "Processing stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Processing stack status: {status}"
 
     def test_processing_stack_has_required_outputs(self, processing_stack_outputs):
         """Processing stack should export job and bucket names."""
-        required = [
-            "GlueJobName",
-            "GlueDatabaseName",
-            "QuarantineBucketName",
-            "GlueScriptsBucketName"
-        ]
-        for output in required:
-            assert output in processing_stack_outputs, f"Missing {output} output"
+        missing = REQUIRED_OUTPUTS - processing_stack_outputs.keys()
+        assert not missing, f"Missing outputs: {sorted(missing)}"
 
     def test_curated_bucket_in_storage_stack(self, storage_stack_outputs):
         """CuratedBucketName should be in storage-ingestion stack."""
@@ -37,212 +73,112 @@ class TestProcessingStack:
 
 
 @pytest.mark.phase2
+@pytest.mark.unit
+@pytest.mark.xdist_group(name="glue_job")
 class TestGlueJob:
     """Test Glue ETL job configuration."""
 
-    def test_glue_job_exists(self, glue_client, environment_name):
+    def test_glue_job_exists(self, glue_job_response, glue_job_name):
         """Glue ETL job should exist."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-        assert response["Job"]["Name"] == job_name
+        assert glue_job_response["Name"] == glue_job_name
 
-    def test_glue_job_version(self, glue_client, environment_name):
+    def test_glue_job_version(self, glue_job_response):
         """Glue job should use version 4.0."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-        assert response["Job"]["GlueVersion"] == "4.0", "Job should use Glue 4.0"
+        assert glue_job_response["GlueVersion"] == "4.0", "Job should use Glue 4.0"
 
-    def test_glue_job_worker_config(self, glue_client, environment_name):
+    def test_glue_job_worker_config(self, glue_job_response):
         """Glue job should have correct worker configuration."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-
-        job = response["Job"]
+        job = glue_job_response
         assert job["WorkerType"] == "G.1X", "Expected G.1X worker type"
         assert job["NumberOfWorkers"] >= 2, "Should have at least 2 workers"
 
-    def test_glue_job_has_required_arguments(self, glue_client, environment_name):
-        """Glue job should have all required default arguments."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-
-        args = response["Job"]["DefaultArguments"]
-        required_args = [
-            "--RAW_BUCKET",
-            "--CURATED_BUCKET",
-            "--QUARANTINE_BUCKET",
-            "--SECRET_ARN",
-            "--KMS_KEY_ARN",
-            "--DATABASE_NAME",
-            "--TABLE_NAME"
-        ]
-
-        for arg in required_args:
-            assert arg in args, f"Missing required argument: {arg}"
-
-    def test_glue_job_has_redshift_arguments(self, glue_client, environment_name):
-        """Glue job should have Redshift arguments (Phase 3 requirement)."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-
-        args = response["Job"]["DefaultArguments"]
-        redshift_args = [
-            "--REDSHIFT_CONNECTION",
-            "--REDSHIFT_IAM_ROLE",
-            "--REDSHIFT_TEMP_DIR"
-        ]
-
-        for arg in redshift_args:
-            assert arg in args, f"Missing Redshift argument: {arg}"
-
-    def test_glue_job_has_connection(self, glue_client, environment_name):
-        """Glue job should have Redshift connection attached."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
+    @pytest.mark.parametrize("arg", REQUIRED_JOB_ARGS + REDSHIFT_JOB_ARGS)
+    def test_glue_job_has_argument(self, glue_job_response, arg):
+        """Glue job should have all required default arguments (incl. Phase 3 Redshift)."""
+        assert arg in glue_job_response["DefaultArguments"], f"Missing required argument: {arg}"
 
-        connections = response["Job"].get("Connections", {}).get("Connections", [])
+    def test_glue_job_has_connection(self, glue_job_response):
+        """Glue job should have Redshift connection attached."""
+        connections = glue_job_response.get("Connections", {}).get("Connections", [])
         assert len(connections) > 0, "No connections attached to job"
-        assert any("redshift" in c.lower() for c in connections), "Redshift connection not found"
+        assert any(REDSHIFT_CONNECTION_PATTERN.search(c) for c in connections), \
+            "Redshift connection not found"
 
-    def test_glue_job_max_concurrent_runs(self, glue_client, environment_name):
+    def test_glue_job_max_concurrent_runs(self, glue_job_response):
         """Glue job should limit concurrent runs to 1."""
-        job_name = f"{environment_name}-etl-job"
-        response = glue_client.get_job(JobName=job_name)
-
-        max_runs = response["Job"]["ExecutionProperty"]["MaxConcurrentRuns"]
+        max_runs = glue_job_response["ExecutionProperty"]["MaxConcurrentRuns"]
         assert max_runs == 1, f"MaxConcurrentRuns should be 1, got {max_runs}"
 
 
 @pytest.mark.phase2
+@pytest.mark.unit
+@pytest.mark.xdist_group(name="glue_role")
 class TestGlueJobRole:
     """Test Glue job IAM role configuration."""
 
-    def test_glue_role_exists(self, iam_client, environment_name):
+    def test_glue_role_exists(self, glue_role_bundle, environment_name):
         """Glue ETL role should exist."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.get_role(RoleName=role_name)
-        assert response["Role"]["RoleName"] == role_name
+        assert glue_role_bundle.role["RoleName"] == f"{environment_name}-glue-etl-role"
 
-    def test_glue_role_trust_policy(self, iam_client, environment_name):
+    def test_glue_role_trust_policy(self, glue_role_bundle):
         """Glue role should trust glue.amazonaws.com."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.get_role(RoleName=role_name)
-
-        trust_policy = response["Role"]["AssumeRolePolicyDocument"]
-        principals = []
-        for statement in trust_policy.get("Statement", []):
-            principal = statement.get("Principal", {})
-            if isinstance(principal.get("Service"), str):
-                principals.append(principal["Service"])
-            elif isinstance(principal.get("Service"), list):
-                principals.extend(principal["Service"])
-
+        trust_policy = glue_role_bundle.role["AssumeRolePolicyDocument"]
+        principals = trusted_services(trust_policy)
         assert "glue.amazonaws.com" in principals, "Glue service not in trust policy"
 
-    def test_glue_role_has_managed_policy(self, iam_client, environment_name):
+    def test_glue_role_has_managed_policy(self, glue_role_bundle):
         """Glue role should have AWSGlueServiceRole attached."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.list_attached_role_policies(RoleName=role_name)
-
-        policy_arns = [p["PolicyArn"] for p in response["AttachedPolicies"]]
+        policy_arns = [p["PolicyArn"] for p in glue_role_bundle.attached]
         glue_policy = "arn:aws:iam::aws:policy/service-role/AWSGlueServiceRole"
         assert glue_policy in policy_arns, "AWSGlueServiceRole not attached"
 
-    def test_glue_role_has_s3_permissions(self, iam_client, environment_name):
+    def test_glue_role_has_s3_permissions(self, glue_role_capabilities):
         """Glue role should have S3 read/write permissions."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        has_s3 = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "s3:GetObject" in policy_str and "s3:PutObject" in policy_str:
-                has_s3 = True
-                break
-
-        assert has_s3, "Glue role missing S3 permissions"
+        assert {"s3:GetObject", "s3:PutObject"} <= glue_role_capabilities, \
+            "Glue role missing S3 permissions"
 
-    def test_glue_role_has_kms_permissions(self, iam_client, environment_name):
+    def test_glue_role_has_kms_permissions(self, glue_role_capabilities):
         """Glue role should have KMS permissions."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
+        assert {"kms:Decrypt", "kms:Encrypt"} <= glue_role_capabilities, \
+            "Glue role missing KMS permissions"
 
-        has_kms = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "kms:Decrypt" in policy_str and "kms:Encrypt" in policy_str:
-                has_kms = True
-                break
-
-        assert has_kms, "Glue role missing KMS permissions"
-
-    def test_glue_role_has_secrets_manager_permissions(self, iam_client, environment_name):
+    def test_glue_role_has_secrets_manager_permissions(self, glue_role_capabilities):
         """Glue role should have Secrets Manager permissions."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        has_secrets = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "secretsmanager:GetSecretValue" in policy_str:
-                has_secrets = True
-                break
-
-        assert has_secrets, "Glue role missing Secrets Manager permissions"
+        assert "secretsmanager:GetSecretValue" in glue_role_capabilities, \
+            "Glue role missing Secrets Manager permissions"
 
-    def test_glue_role_has_ec2_network_permissions(self, iam_client, environment_name):
+    def test_glue_role_has_ec2_network_permissions(self, glue_role_capabilities):
         """Glue role should have EC2 network permissions for VPC connections."""
-        role_name = f"{environment_name}-glue-etl-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        has_ec2 = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "ec2:CreateNetworkInterface" in policy_str:
-                has_ec2 = True
-                break
-
-        assert has_ec2, "Glue role missing EC2 network permissions"
+        assert "ec2:CreateNetworkInterface" in glue_role_capabilities, \
+            "Glue role missing EC2 network permissions"
 
 
 @pytest.mark.phase2
+@pytest.mark.unit
 class TestGlueDatabase:
     """Test Glue Data Catalog database."""
 
-    def test_glue_database_exists(self, glue_client, environment_name):
+    def test_glue_database_exists(self, glue_database, environment_name):
         """Glue database should exist."""
-        db_name = f"{environment_name}_db"
-        response = glue_client.get_database(Name=db_name)
-        assert response["Database"]["Name"] == db_name
+        assert glue_database["Name"] == f"{environment_name}_db"
 
-    def test_glue_database_has_description(self, glue_client, environment_name):
+    def test_glue_database_has_description(self, glue_database):
         """Glue database should have a description."""
-        db_name = f"{environment_name}_db"
-        response = glue_client.get_database(Name=db_name)
-        assert response["Database"].get("Description"), "Database missing description"
+        assert glue_database.get("Description"), "Database missing description"
 
 
 @pytest.mark.phase2
 class TestGlueCrawler:
     """Test Glue crawler configuration."""
 
-    def test_glue_crawler_exists(self, glue_client, environment_name):
+    def test_glue_crawler_exists(self, glue_crawler, environment_name):
         """Glue crawler should exist."""
-        crawler_name = f"{environment_name}-curated-crawler"
-        response = glue_client.get_crawler(Name=crawler_name)
-        assert response["Crawler"]["Name"] == crawler_name
+        assert glue_crawler["Name"] == f"{environment_name}-curated-crawler"
 
-    def test_glue_crawler_targets_curated_bucket(self, glue_client, environment_name, storage_stack_outputs):
+    def test_glue_crawler_targets_curated_bucket(self, glue_crawler, storage_stack_outputs):
         """Glue crawler should target curated bucket."""
-        crawler_name = f"{environment_name}-curated-crawler"
         curated_bucket = storage_stack_outputs.get("CuratedBucketName")
-
-        response = glue_client.get_crawler(Name=crawler_name)
-        targets = response["Crawler"]["Targets"].get("S3Targets", [])
+        targets = glue_crawler["Targets"].get("S3Targets", [])
 
         target_paths = [t["Path"] for t in targets]
         assert any(curated_bucket in p for p in target_paths), \
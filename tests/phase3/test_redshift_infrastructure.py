@@ -4,112 +4,85 @@ Phase 3 Tests - Redshift Infrastructure
 Tests for Redshift Serverless deployment and configuration.
 """
 
-import json
 import pytest
-from tests.conftest import get_stack_status
+from tests.conftest import get_stack_status, granted_actions, trusted_services
+
+REQUIRED_OUTPUTS = frozenset({
+    "RedshiftWorkgroupName",
+    "RedshiftEndpoint",
+    "RedshiftS3RoleArn",
+    "GlueConnectionName",
+    "GlueConnectionSecurityGroupId"
+})
+
+# (get_workgroup attribute, expected value)
+WORKGROUP_PROPERTIES = (
+    ("status", "AVAILABLE"),
+    ("publiclyAccessible", False),
+    ("enhancedVpcRouting", True)
+)
 
 
 @pytest.mark.phase3
 class TestRedshiftStack:
     """Test Redshift CloudFormation stack deployment."""
 
-    def test_redshift_stack_exists(self, cloudformation_client, environment_name):
+    def test_redshift_stack_exists(self, all_stacks, environment_name):
         """Redshift stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-redshift")
+        status = get_stack_status(all_stacks, f"{environment_name}-redshift")
         assert status is not None, "Redshift stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Redshift stack status: {status}"
 
     def test_redshift_stack_has_required_outputs(self, redshift_stack_outputs):
         """Redshift stack should export workgroup and connection names."""
-        required = [
-            "RedshiftWorkgroupName",
-            "RedshiftEndpoint",
-            "RedshiftS3RoleArn",
-            "GlueConnectionName",
-            "GlueConnectionSecurityGroupId"
-        ]
-        for output in required:
-            assert output in redshift_stack_outputs, f"Missing {output} output"
+        missing = REQUIRED_OUTPUTS - redshift_stack_outputs.keys()
+        assert not missing, f"Missing outputs: {sorted(missing)}"
 
 
 @pytest.mark.phase3
 class TestRedshiftServerless:
     """Test Redshift Serverless workgroup configuration."""
 
-    def test_redshift_namespace_exists(self, redshift_serverless_client, environment_name):
+    def test_redshift_namespace_exists(self, redshift_namespace, environment_name):
         """Redshift namespace should exist."""
-        namespace_name = f"{environment_name}-namespace"
-        response = redshift_serverless_client.get_namespace(namespaceName=namespace_name)
-        assert response["namespace"]["namespaceName"] == namespace_name
+        assert redshift_namespace["namespaceName"] == f"{environment_name}-namespace"
 
-    def test_redshift_namespace_has_database(self, redshift_serverless_client, environment_name):
+    def test_redshift_namespace_has_database(self, redshift_namespace):
         """Namespace should have healthcare_analytics database."""
-        namespace_name = f"{environment_name}-namespace"
-        response = redshift_serverless_client.get_namespace(namespaceName=namespace_name)
-        assert response["namespace"]["dbName"] == "healthcare_analytics", \
+        assert redshift_namespace["dbName"] == "healthcare_analytics", \
             "Database should be healthcare_analytics"
 
-    def test_redshift_namespace_kms_encrypted(self, redshift_serverless_client, environment_name, kms_stack_outputs):
+    def test_redshift_namespace_kms_encrypted(self, redshift_namespace, kms_stack_outputs):
         """Namespace should be encrypted with customer KMS key."""
-        namespace_name = f"{environment_name}-namespace"
-        response = redshift_serverless_client.get_namespace(namespaceName=namespace_name)
-
-        kms_key_id = response["namespace"].get("kmsKeyId")
+        kms_key_id = redshift_namespace.get("kmsKeyId")
         assert kms_key_id, "Namespace not KMS encrypted"
 
         expected_key = kms_stack_outputs.get("KmsKeyArn")
         assert expected_key in kms_key_id or kms_stack_outputs.get("KmsKeyId") in kms_key_id, \
             "Namespace using wrong KMS key"
 
-    def test_redshift_namespace_has_iam_role(self, redshift_serverless_client, environment_name):
+    def test_redshift_namespace_has_iam_role(self, redshift_namespace):
         """Namespace should have IAM role for S3 access."""
-        namespace_name = f"{environment_name}-namespace"
-        response = redshift_serverless_client.get_namespace(namespaceName=namespace_name)
-
-        iam_roles = response["namespace"].get("iamRoles", [])
+        iam_roles = redshift_namespace.get("iamRoles", [])
         assert len(iam_roles) > 0, "No IAM roles attached to namespace"
 
-    def test_redshift_workgroup_exists(self, redshift_serverless_client, environment_name):
-        """Redshift workgroup should exist and be available."""
-        workgroup_name = f"{environment_name}-workgroup"
-        response = redshift_serverless_client.get_workgroup(workgroupName=workgroup_name)
-
-        status = response["workgroup"]["status"]
-        assert status == "AVAILABLE", f"Workgroup status: {status}"
-
-    def test_redshift_workgroup_not_publicly_accessible(self, redshift_serverless_client, environment_name):
-        """Workgroup should not be publicly accessible."""
-        workgroup_name = f"{environment_name}-workgroup"
-        response = redshift_serverless_client.get_workgroup(workgroupName=workgroup_name)
-
-        assert not response["workgroup"]["publiclyAccessible"], \
-            "Workgroup should not be publicly accessible"
+    @pytest.mark.parametrize("attr,expected", WORKGROUP_PROPERTIES)
+    def test_redshift_workgroup_property(self, redshift_workgroup, attr, expected):
+        """Workgroup should be available, private and use enhanced VPC routing."""
+        actual = redshift_workgroup.get(attr)
+        assert actual == expected, f"Workgroup {attr}: expected {expected}, got {actual}"
 
-    def test_redshift_workgroup_enhanced_vpc_routing(self, redshift_serverless_client, environment_name):
-        """Workgroup should have enhanced VPC routing enabled."""
-        workgroup_name = f"{environment_name}-workgroup"
-        response = redshift_serverless_client.get_workgroup(workgroupName=workgroup_name)
-
-        assert response["workgroup"]["enhancedVpcRouting"], \
-            "Enhanced VPC routing should be enabled"
-
-    def test_redshift_workgroup_in_private_subnets(self, redshift_serverless_client, environment_name, networking_stack_outputs):
+    def test_redshift_workgroup_in_private_subnets(self, redshift_workgroup, networking_stack_outputs):
         """Workgroup should be in private subnets."""
-        workgroup_name = f"{environment_name}-workgroup"
-        response = redshift_serverless_client.get_workgroup(workgroupName=workgroup_name)
-
-        workgroup_subnets = response["workgroup"]["subnetIds"]
+        workgroup_subnets = redshift_workgroup["subnetIds"]
         expected_subnets = networking_stack_outputs.get("PrivateSubnetIds", "").split(",")
 
         for subnet in expected_subnets:
             assert subnet in workgroup_subnets, f"Subnet {subnet} not in workgroup"
 
-    def test_redshift_workgroup_has_endpoint(self, redshift_serverless_client, environment_name):
+    def test_redshift_workgroup_has_endpoint(self, redshift_workgroup):
         """Workgroup should have an endpoint."""
-        workgroup_name = f"{environment_name}-workgroup"
-        response = redshift_serverless_client.get_workgroup(workgroupName=workgroup_name)
-
-        endpoint = response["workgroup"].get("endpoint", {})
+        endpoint = redshift_workgroup.get("endpoint", {})
         assert endpoint.get("address"), "Workgroup has no endpoint address"
         assert endpoint.get("port") == 5439, f"Expected port 5439, got {endpoint.get('port')}"
 
@@ -118,43 +91,31 @@ class TestRedshiftServerless:
 class TestRedshiftSecurityGroups:
     """Test Redshift security group configuration."""
 
-    def test_glue_connection_sg_exists(self, ec2_client, redshift_stack_outputs):
+    def test_glue_connection_sg_exists(self, security_groups, redshift_stack_outputs):
         """Glue connection security group should exist."""
         sg_id = redshift_stack_outputs.get("GlueConnectionSecurityGroupId")
         assert sg_id, "Security group ID not found"
+        assert sg_id in security_groups, "Security group not found"
 
-        response = ec2_client.describe_security_groups(GroupIds=[sg_id])
-        assert len(response["SecurityGroups"]) == 1, "Security group not found"
-
-    def test_glue_connection_sg_has_self_reference(self, ec2_client, redshift_stack_outputs):
+    def test_glue_connection_sg_has_self_reference(self, security_groups, redshift_stack_outputs):
         """Glue connection SG should allow self-referencing traffic."""
         sg_id = redshift_stack_outputs.get("GlueConnectionSecurityGroupId")
-        response = ec2_client.describe_security_groups(GroupIds=[sg_id])
-
-        ingress_rules = response["SecurityGroups"][0]["IpPermissions"]
-        has_self_ref = False
-
-        for rule in ingress_rules:
-            for group in rule.get("UserIdGroupPairs", []):
-                if group.get("GroupId") == sg_id:
-                    has_self_ref = True
-                    break
-
-        assert has_self_ref, "Glue connection SG missing self-referencing rule"
-
-    def test_redshift_sg_allows_from_glue_sg(self, ec2_client, redshift_stack_outputs, environment_name):
+        assert sg_id in security_groups, "Security group not found"
+        referenced = {
+            group.get("GroupId")
+            for rule in security_groups[sg_id]["IpPermissions"]
+            for group in rule.get("UserIdGroupPairs", [])
+        }
+        assert sg_id in referenced, "Glue connection SG missing self-referencing rule"
+
+    def test_redshift_sg_allows_from_glue_sg(self, security_groups, redshift_stack_outputs, environment_name):
         """Redshift SG should allow traffic from Glue connection SG on port 5439."""
         glue_sg_id = redshift_stack_outputs.get("GlueConnectionSecurityGroupId")
 
-        # Find Redshift security group
-        response = ec2_client.describe_security_groups(
-            Filters=[{"Name": "group-name", "Values": [f"{environment_name}-redshift-sg"]}]
-        )
-
-        if not response["SecurityGroups"]:
+        redshift_sg = security_groups.get(f"{environment_name}-redshift-sg")
+        if redshift_sg is None:
             pytest.skip("Redshift security group not found by name")
 
-        redshift_sg = response["SecurityGroups"][0]
         ingress_rules = redshift_sg["IpPermissions"]
 
         has_glue_ingress = False
@@ -172,92 +133,49 @@ class TestRedshiftSecurityGroups:
 class TestRedshiftIAMRole:
     """Test Redshift S3 access IAM role."""
 
-    def test_redshift_s3_role_exists(self, iam_client, environment_name):
+    def test_redshift_s3_role_exists(self, redshift_s3_role, environment_name):
         """Redshift S3 role should exist."""
-        role_name = f"{environment_name}-redshift-s3-role"
-        response = iam_client.get_role(RoleName=role_name)
-        assert response["Role"]["RoleName"] == role_name
+        assert redshift_s3_role["RoleName"] == f"{environment_name}-redshift-s3-role"
 
-    def test_redshift_s3_role_trust_policy(self, iam_client, environment_name):
+    def test_redshift_s3_role_trust_policy(self, redshift_s3_role):
         """Redshift role should trust redshift.amazonaws.com."""
-        role_name = f"{environment_name}-redshift-s3-role"
-        response = iam_client.get_role(RoleName=role_name)
-
-        trust_policy = response["Role"]["AssumeRolePolicyDocument"]
-        principals = []
-        for statement in trust_policy.get("Statement", []):
-            principal = statement.get("Principal", {})
-            if isinstance(principal.get("Service"), str):
-                principals.append(principal["Service"])
-            elif isinstance(principal.get("Service"), list):
-                principals.extend(principal["Service"])
-
+        principals = trusted_services(redshift_s3_role["AssumeRolePolicyDocument"])
         assert "redshift.amazonaws.com" in principals, "Redshift service not in trust policy"
 
-    def test_redshift_s3_role_has_s3_permissions(self, iam_client, environment_name):
+    def test_redshift_s3_role_has_s3_permissions(self, role_policy_actions, environment_name):
         """Redshift role should have S3 read permissions."""
-        role_name = f"{environment_name}-redshift-s3-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
+        actions = role_policy_actions(f"{environment_name}-redshift-s3-role")
+        assert granted_actions(actions, {"s3:GetObject"}), "Redshift role missing S3 permissions"
 
-        has_s3 = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "s3:GetObject" in policy_str:
-                has_s3 = True
-                break
-
-        assert has_s3, "Redshift role missing S3 permissions"
-
-    def test_redshift_s3_role_has_kms_permissions(self, iam_client, environment_name):
+    def test_redshift_s3_role_has_kms_permissions(self, role_policy_actions, environment_name):
         """Redshift role should have KMS decrypt permissions."""
-        role_name = f"{environment_name}-redshift-s3-role"
-        response = iam_client.list_role_policies(RoleName=role_name)
-
-        has_kms = False
-        for policy_name in response["PolicyNames"]:
-            policy_doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(policy_doc["PolicyDocument"])
-            if "kms:Decrypt" in policy_str:
-                has_kms = True
-                break
-
-        assert has_kms, "Redshift role missing KMS permissions"
+        actions = role_policy_actions(f"{environment_name}-redshift-s3-role")
+        assert granted_actions(actions, {"kms:Decrypt"}), "Redshift role missing KMS permissions"
 
 
 @pytest.mark.phase3
 class TestGlueConnection:
     """Test Glue connection for Redshift."""
 
-    def test_glue_connection_exists(self, glue_client, environment_name):
+    def test_glue_connection_exists(self, glue_redshift_connection, environment_name):
         """Glue connection for Redshift should exist."""
-        connection_name = f"{environment_name}-redshift-connection"
-        response = glue_client.get_connection(Name=connection_name)
-        assert response["Connection"]["Name"] == connection_name
+        assert glue_redshift_connection["Name"] == f"{environment_name}-redshift-connection"
 
-    def test_glue_connection_type_is_jdbc(self, glue_client, environment_name):
+    def test_glue_connection_type_is_jdbc(self, glue_redshift_connection):
         """Glue connection should be JDBC type."""
-        connection_name = f"{environment_name}-redshift-connection"
-        response = glue_client.get_connection(Name=connection_name)
-        assert response["Connection"]["ConnectionType"] == "JDBC", "Connection should be JDBC type"
+        assert glue_redshift_connection["ConnectionType"] == "JDBC", "Connection should be JDBC type"
 
-    def test_glue_connection_has_jdbc_url(self, glue_client, environment_name):
+    def test_glue_connection_has_jdbc_url(self, glue_redshift_connection):
         """Glue connection should have JDBC URL."""
-        connection_name = f"{environment_name}-redshift-connection"
-        response = glue_client.get_connection(Name=connection_name)
-
-        props = response["Connection"]["ConnectionProperties"]
+        props = glue_redshift_connection["ConnectionProperties"]
         jdbc_url = props.get("JDBC_CONNECTION_URL", "")
 
         assert "jdbc:redshift://" in jdbc_url, "Missing Redshift JDBC URL"
         assert "healthcare_analytics" in jdbc_url, "JDBC URL should reference healthcare_analytics database"
         assert ":5439/" in jdbc_url, "JDBC URL should use port 5439"
 
-    def test_glue_connection_has_vpc_config(self, glue_client, environment_name):
+    def test_glue_connection_has_vpc_config(self, glue_redshift_connection):
         """Glue connection should have VPC configuration."""
-        connection_name = f"{environment_name}-redshift-connection"
-        response = glue_client.get_connection(Name=connection_name)
-
-        physical_conn = response["Connection"].get("PhysicalConnectionRequirements", {})
+        physical_conn = glue_redshift_connection.get("PhysicalConnectionRequirements", {})
         assert physical_conn.get("SubnetId"), "Connection missing subnet"
         assert physical_conn.get("SecurityGroupIdList"), "Connection missing security groups"
@@ -9,10 +9,71 @@ Tests for:
 - Integration tests for erasure flow
 """
 
+import functools
 import hashlib
-import json
+import re
 import pytest
-from tests.conftest import get_stack_status, get_stack_outputs
+from tests.conftest import (
+    ERASURE_ENDPOINT_SERVICES, get_stack_status, get_stack_outputs, granted_actions, trusted_services
+)
+
+# Quotes, statement separator and comment markers: ' " ; -- /* */
+SQL_INJECTION_PATTERN = re.compile(r"""['";]|--|/\*|\*/""")
+
+REQUIRED_OUTPUTS = frozenset({
+    "GdprRequestsTableName",
+    "GdprRequestsTableArn",
+    "ErasureHandlerArn",
+    "ErasureAthenaWorkgroupName"
+})
+
+# Actions the erasure handler calls, checked against the role's inline policies
+ERASURE_ROLE_ACTIONS = (
+    "athena:StartQueryExecution",
+    "athena:GetQueryResults",
+    "redshift-data:ExecuteStatement",
+    "s3:GetObject",
+    "s3:DeleteObject",
+    "kms:Decrypt",
+    "kms:GenerateDataKey"
+)
+
+# (cw_state key, field, expected value) for the erasure monitoring resources;
+# string values are formatted with environment_name
+CLOUDWATCH_CHECKS = (
+    pytest.param(
+        "log_group", "logGroupName", "/aws/lambda/{environment_name}-erasure-handler",
+        id="log-group-exists"
+    ),
+    pytest.param("log_group", "retentionInDays", 365, id="log-group-retention"),
+    pytest.param(
+        "alarm", "AlarmName", "{environment_name}-erasure-failures",
+        id="failure-alarm-exists"
+    )
+)
+
+REQUIRED_ENV_VARS = frozenset({
+    "ENVIRONMENT_NAME",
+    "CURATED_BUCKET",
+    "GLUE_DATABASE",
+    "GLUE_TABLE",
+    "ATHENA_WORKGROUP",
+    "REDSHIFT_WORKGROUP",
+    "REDSHIFT_DATABASE",
+    "REQUESTS_TABLE"
+})
+
+
+@functools.lru_cache(maxsize=128)
+def _sha256_hex(data: bytes) -> str:
+    """Memoized SHA-256 hex digest for the deterministic inputs used below."""
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture(scope="module")
+def erasure_role_capabilities(erasure_role_actions):
+    """Required actions the erasure role grants, resolved once against wildcards like kms:GenerateDataKey*."""
+    return granted_actions(erasure_role_actions, ERASURE_ROLE_ACTIONS)
 
 
 # =============================================================================
@@ -20,6 +81,7 @@ from tests.conftest import get_stack_status, get_stack_outputs
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestErasureLogic:
     """Unit tests for erasure handler logic."""
 
@@ -28,10 +90,14 @@ class TestErasureLogic:
         patient_id = "patient-12345"
         salt = "test-salt"
         combined = f"{patient_id}{salt}"
-        patient_hash = hashlib.sha256(combined.encode()).hexdigest()
+        patient_hash = _sha256_hex(combined.encode())
 
+        try:
+            bytes.fromhex(patient_hash)
+        except ValueError:
+            pytest.fail(f"Hash is not hex: {patient_hash}")
         assert len(patient_hash) == 64
-        assert all(c in '0123456789abcdef' for c in patient_hash)
+        assert patient_hash == patient_hash.lower(), "Hash should be lowercase hex"
 
     def test_request_status_values(self):
         """Verify valid status values for erasure requests."""
@@ -43,11 +109,9 @@ class TestErasureLogic:
     def test_athena_query_escaping(self):
         """Ensure patient hash is safe for SQL queries (no injection risk)."""
         # SHA256 hex output should never contain SQL injection characters
-        test_hash = hashlib.sha256(b"test").hexdigest()
-        dangerous_chars = ["'", '"', ';', '--', '/*', '*/']
-
-        for char in dangerous_chars:
-            assert char not in test_hash, f"Hash should not contain {char}"
+        test_hash = _sha256_hex(b"test")
+        match = SQL_INJECTION_PATTERN.search(test_hash)
+        assert match is None, f"Hash should not contain {match.group() if match else ''}"
 
 
 # =============================================================================
@@ -58,22 +122,16 @@ class TestErasureLogic:
 class TestComplianceStack:
     """Test compliance CloudFormation stack deployment."""
 
-    def test_compliance_stack_exists(self, cloudformation_client, environment_name):
+    def test_compliance_stack_exists(self, all_stacks, environment_name):
         """Compliance stack should be deployed."""
-        status = get_stack_status(cloudformation_client, f"{environment_name}-compliance")
+        status = get_stack_status(all_stacks, f"{environment_name}-compliance")
         assert status is not None, "Compliance stack not found"
         assert status in ["CREATE_COMPLETE", "UPDATE_COMPLETE"], f"Stack status: {status}"
 
     def test_stack_has_required_outputs(self, compliance_stack_outputs):
         """Stack should export required resources."""
-        required = [
-            "GdprRequestsTableName",
-            "GdprRequestsTableArn",
-            "ErasureHandlerArn",
-            "ErasureAthenaWorkgroupName"
-        ]
-        for output in required:
-            assert output in compliance_stack_outputs, f"Missing output: {output}"
+        missing = REQUIRED_OUTPUTS - compliance_stack_outputs.keys()
+        assert not missing, f"Missing outputs: {sorted(missing)}"
 
 
 # =============================================================================
@@ -81,30 +139,23 @@ class TestComplianceStack:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestDynamoDBTable:
     """Test GDPR requests DynamoDB table configuration."""
 
-    def test_table_exists(self, dynamodb_client, environment_name):
+    def test_table_exists(self, gdpr_table, environment_name):
         """GDPR requests table should exist."""
-        table_name = f"{environment_name}-gdpr-requests"
-        response = dynamodb_client.describe_table(TableName=table_name)
-        assert response["Table"]["TableName"] == table_name
+        assert gdpr_table["TableName"] == f"{environment_name}-gdpr-requests"
 
-    def test_table_has_stream_enabled(self, dynamodb_client, environment_name):
+    def test_table_has_stream_enabled(self, gdpr_table):
         """Table should have DynamoDB Streams enabled."""
-        table_name = f"{environment_name}-gdpr-requests"
-        response = dynamodb_client.describe_table(TableName=table_name)
-
-        stream_spec = response["Table"].get("StreamSpecification", {})
+        stream_spec = gdpr_table.get("StreamSpecification", {})
         assert stream_spec.get("StreamEnabled") is True, "Stream not enabled"
         assert stream_spec.get("StreamViewType") == "NEW_AND_OLD_IMAGES"
 
-    def test_table_encrypted_with_kms(self, dynamodb_client, environment_name):
+    def test_table_encrypted_with_kms(self, gdpr_table):
         """Table should be encrypted with KMS."""
-        table_name = f"{environment_name}-gdpr-requests"
-        response = dynamodb_client.describe_table(TableName=table_name)
-
-        sse = response["Table"].get("SSEDescription", {})
+        sse = gdpr_table.get("SSEDescription", {})
         assert sse.get("Status") == "ENABLED", "SSE not enabled"
         assert sse.get("SSEType") == "KMS", "Should use KMS encryption"
 
@@ -116,21 +167,15 @@ class TestDynamoDBTable:
         pitr = response["ContinuousBackupsDescription"]["PointInTimeRecoveryDescription"]
         assert pitr["PointInTimeRecoveryStatus"] == "ENABLED"
 
-    def test_table_has_status_gsi(self, dynamodb_client, environment_name):
+    def test_table_has_status_gsi(self, gdpr_table):
         """Table should have GSI on status for querying pending/failed requests."""
-        table_name = f"{environment_name}-gdpr-requests"
-        response = dynamodb_client.describe_table(TableName=table_name)
-
-        gsis = response["Table"].get("GlobalSecondaryIndexes", [])
+        gsis = gdpr_table.get("GlobalSecondaryIndexes", [])
         gsi_names = [gsi["IndexName"] for gsi in gsis]
         assert "status-index" in gsi_names, "Missing status-index GSI"
 
-    def test_table_billing_mode(self, dynamodb_client, environment_name):
+    def test_table_billing_mode(self, gdpr_table):
         """Table should use on-demand billing."""
-        table_name = f"{environment_name}-gdpr-requests"
-        response = dynamodb_client.describe_table(TableName=table_name)
-
-        billing = response["Table"].get("BillingModeSummary", {})
+        billing = gdpr_table.get("BillingModeSummary", {})
         assert billing.get("BillingMode") == "PAY_PER_REQUEST", "Should use on-demand billing"
 
 
@@ -139,81 +184,47 @@ class TestDynamoDBTable:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestErasureLambda:
     """Test erasure handler Lambda configuration."""
 
-    def test_lambda_function_exists(self, lambda_client, environment_name):
+    def test_lambda_function_exists(self, erasure_lambda, environment_name):
         """Erasure handler Lambda should exist."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-        assert response["Configuration"]["FunctionName"] == function_name
+        assert erasure_lambda["FunctionName"] == f"{environment_name}-erasure-handler"
 
-    def test_lambda_runtime_is_python312(self, lambda_client, environment_name):
+    def test_lambda_runtime_is_python312(self, erasure_lambda):
         """Lambda should use Python 3.12 runtime."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-        assert response["Configuration"]["Runtime"] == "python3.12"
+        assert erasure_lambda["Runtime"] == "python3.12"
 
-    def test_lambda_timeout_adequate(self, lambda_client, environment_name):
+    def test_lambda_timeout_adequate(self, erasure_lambda):
         """Lambda timeout should be at least 5 minutes for large partitions."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-        timeout = response["Configuration"]["Timeout"]
+        timeout = erasure_lambda["Timeout"]
         assert timeout >= 300, f"Timeout too short: {timeout}s (need >= 300s)"
 
-    def test_lambda_memory_adequate(self, lambda_client, environment_name):
+    def test_lambda_memory_adequate(self, erasure_lambda):
         """Lambda should have at least 512MB memory."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-        memory = response["Configuration"]["MemorySize"]
+        memory = erasure_lambda["MemorySize"]
         assert memory >= 512, f"Memory too low: {memory}MB (need >= 512MB)"
 
-    def test_lambda_in_vpc(self, lambda_client, environment_name):
+    def test_lambda_in_vpc(self, erasure_lambda):
         """Lambda should be deployed in VPC for private connectivity."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-
-        vpc_config = response["Configuration"].get("VpcConfig", {})
+        vpc_config = erasure_lambda.get("VpcConfig", {})
         assert vpc_config.get("SubnetIds"), "Lambda not in VPC (no subnets)"
         assert vpc_config.get("SecurityGroupIds"), "Lambda missing security groups"
 
-    def test_lambda_has_required_env_vars(self, lambda_client, environment_name):
+    def test_lambda_has_required_env_vars(self, erasure_lambda_env_keys):
         """Lambda should have required environment variables."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.get_function(FunctionName=function_name)
-
-        env_vars = response["Configuration"].get("Environment", {}).get("Variables", {})
-        required_vars = [
-            "ENVIRONMENT_NAME",
-            "CURATED_BUCKET",
-            "GLUE_DATABASE",
-            "GLUE_TABLE",
-            "ATHENA_WORKGROUP",
-            "REDSHIFT_WORKGROUP",
-            "REDSHIFT_DATABASE",
-            "REQUESTS_TABLE"
-        ]
-
-        for var in required_vars:
-            assert var in env_vars, f"Missing env var: {var}"
-
-    def test_lambda_has_dynamodb_trigger(self, lambda_client, environment_name):
-        """Lambda should have DynamoDB Streams trigger."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.list_event_source_mappings(FunctionName=function_name)
+        missing = REQUIRED_ENV_VARS - erasure_lambda_env_keys
+        assert not missing, f"Missing env vars: {sorted(missing)}"
 
-        ddb_triggers = [
-            m for m in response["EventSourceMappings"]
-            if "dynamodb" in m["EventSourceArn"]
-        ]
+    def test_lambda_has_dynamodb_trigger(self, erasure_esm):
+        """Lambda should have DynamoDB Streams trigger."""
+        ddb_triggers = [m for m in erasure_esm if "dynamodb" in m["EventSourceArn"]]
         assert len(ddb_triggers) >= 1, "No DynamoDB trigger found"
 
-    def test_lambda_trigger_has_filter(self, lambda_client, environment_name):
+    def test_lambda_trigger_has_filter(self, erasure_esm):
         """Lambda trigger should filter for APPROVED status only."""
-        function_name = f"{environment_name}-erasure-handler"
-        response = lambda_client.list_event_source_mappings(FunctionName=function_name)
-
-        for mapping in response["EventSourceMappings"]:
+        for mapping in erasure_esm:
             if "dynamodb" in mapping["EventSourceArn"]:
                 filter_criteria = mapping.get("FilterCriteria", {})
                 filters = filter_criteria.get("Filters", [])
@@ -228,31 +239,24 @@ class TestErasureLambda:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestAthenaWorkgroup:
     """Test Athena workgroup for erasure operations."""
 
-    def test_workgroup_exists(self, athena_client, environment_name):
+    def test_workgroup_exists(self, erasure_athena_workgroup, environment_name):
         """Erasure Athena workgroup should exist."""
-        workgroup_name = f"{environment_name}-erasure-workgroup"
-        response = athena_client.get_work_group(WorkGroup=workgroup_name)
-        assert response["WorkGroup"]["Name"] == workgroup_name
+        assert erasure_athena_workgroup["Name"] == f"{environment_name}-erasure-workgroup"
 
-    def test_workgroup_kms_encrypted(self, athena_client, environment_name):
+    def test_workgroup_kms_encrypted(self, erasure_athena_workgroup):
         """Workgroup results should be KMS encrypted."""
-        workgroup_name = f"{environment_name}-erasure-workgroup"
-        response = athena_client.get_work_group(WorkGroup=workgroup_name)
-
-        config = response["WorkGroup"]["Configuration"]["ResultConfiguration"]
+        config = erasure_athena_workgroup["Configuration"]["ResultConfiguration"]
         encryption = config.get("EncryptionConfiguration", {})
         assert encryption.get("EncryptionOption") == "SSE_KMS", \
             "Workgroup should use SSE_KMS encryption"
 
-    def test_workgroup_enforces_configuration(self, athena_client, environment_name):
+    def test_workgroup_enforces_configuration(self, erasure_athena_workgroup):
         """Workgroup should enforce its configuration."""
-        workgroup_name = f"{environment_name}-erasure-workgroup"
-        response = athena_client.get_work_group(WorkGroup=workgroup_name)
-
-        config = response["WorkGroup"]["Configuration"]
+        config = erasure_athena_workgroup["Configuration"]
         assert config.get("EnforceWorkGroupConfiguration") is True, \
             "Should enforce workgroup configuration"
 
@@ -262,87 +266,23 @@ class TestAthenaWorkgroup:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestIAMPermissions:
     """Test IAM role has required permissions."""
 
-    def test_erasure_role_exists(self, iam_client, environment_name):
+    def test_erasure_role_exists(self, erasure_role, environment_name):
         """Erasure handler IAM role should exist."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        response = iam_client.get_role(RoleName=role_name)
-        assert response["Role"]["RoleName"] == role_name
+        assert erasure_role["RoleName"] == f"{environment_name}-erasure-handler-role"
 
-    def test_role_trusts_lambda(self, iam_client, environment_name):
+    def test_role_trusts_lambda(self, erasure_role):
         """Role should trust Lambda service."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        response = iam_client.get_role(RoleName=role_name)
-
-        trust = response["Role"]["AssumeRolePolicyDocument"]
-        principals = []
-        for stmt in trust.get("Statement", []):
-            svc = stmt.get("Principal", {}).get("Service")
-            if isinstance(svc, str):
-                principals.append(svc)
-            elif isinstance(svc, list):
-                principals.extend(svc)
-
+        principals = trusted_services(erasure_role["AssumeRolePolicyDocument"])
         assert "lambda.amazonaws.com" in principals, "Role should trust lambda.amazonaws.com"
 
-    def test_role_has_athena_permissions(self, iam_client, environment_name):
-        """Role should have Athena permissions."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        policies = iam_client.list_role_policies(RoleName=role_name)
-
-        has_athena = False
-        for policy_name in policies["PolicyNames"]:
-            doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            if "athena:" in json.dumps(doc["PolicyDocument"]):
-                has_athena = True
-                break
-
-        assert has_athena, "Role missing Athena permissions"
-
-    def test_role_has_redshift_data_permissions(self, iam_client, environment_name):
-        """Role should have Redshift Data API permissions."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        policies = iam_client.list_role_policies(RoleName=role_name)
-
-        has_redshift = False
-        for policy_name in policies["PolicyNames"]:
-            doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            if "redshift-data:" in json.dumps(doc["PolicyDocument"]):
-                has_redshift = True
-                break
-
-        assert has_redshift, "Role missing Redshift Data API permissions"
-
-    def test_role_has_s3_permissions(self, iam_client, environment_name):
-        """Role should have S3 permissions for curated bucket."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        policies = iam_client.list_role_policies(RoleName=role_name)
-
-        has_s3 = False
-        for policy_name in policies["PolicyNames"]:
-            doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            policy_str = json.dumps(doc["PolicyDocument"])
-            if "s3:GetObject" in policy_str and "s3:DeleteObject" in policy_str:
-                has_s3 = True
-                break
-
-        assert has_s3, "Role missing S3 read/delete permissions"
-
-    def test_role_has_kms_permissions(self, iam_client, environment_name):
-        """Role should have KMS permissions."""
-        role_name = f"{environment_name}-erasure-handler-role"
-        policies = iam_client.list_role_policies(RoleName=role_name)
-
-        has_kms = False
-        for policy_name in policies["PolicyNames"]:
-            doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-            if "kms:" in json.dumps(doc["PolicyDocument"]):
-                has_kms = True
-                break
-
-        assert has_kms, "Role missing KMS permissions"
+    @pytest.mark.parametrize("action", ERASURE_ROLE_ACTIONS)
+    def test_role_has_permission(self, erasure_role_capabilities, action):
+        """Role should grant Athena, Redshift Data API, S3 read/delete and KMS access."""
+        assert action in erasure_role_capabilities, f"Role missing {action} permission"
 
 
 # =============================================================================
@@ -350,56 +290,16 @@ class TestIAMPermissions:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestVPCEndpoints:
     """Test VPC endpoints required for compliance Lambda."""
 
-    def test_dynamodb_endpoint_exists(self, ec2_client, networking_stack_outputs):
-        """DynamoDB VPC endpoint should exist."""
-        vpc_id = networking_stack_outputs.get("VpcId")
-        assert vpc_id, "VpcId not found in networking outputs"
-
-        response = ec2_client.describe_vpc_endpoints(
-            Filters=[
-                {"Name": "vpc-id", "Values": [vpc_id]},
-                {"Name": "service-name", "Values": ["com.amazonaws.eu-central-1.dynamodb"]}
-            ]
-        )
-
-        endpoints = response.get("VpcEndpoints", [])
-        assert len(endpoints) >= 1, "DynamoDB VPC endpoint not found"
-        assert endpoints[0]["State"] == "available", "DynamoDB endpoint not available"
-
-    def test_athena_endpoint_exists(self, ec2_client, networking_stack_outputs):
-        """Athena VPC endpoint should exist."""
-        vpc_id = networking_stack_outputs.get("VpcId")
-        assert vpc_id, "VpcId not found in networking outputs"
-
-        response = ec2_client.describe_vpc_endpoints(
-            Filters=[
-                {"Name": "vpc-id", "Values": [vpc_id]},
-                {"Name": "service-name", "Values": ["com.amazonaws.eu-central-1.athena"]}
-            ]
-        )
-
-        endpoints = response.get("VpcEndpoints", [])
-        assert len(endpoints) >= 1, "Athena VPC endpoint not found"
-        assert endpoints[0]["State"] == "available", "Athena endpoint not available"
-
-    def test_redshift_data_endpoint_exists(self, ec2_client, networking_stack_outputs):
-        """Redshift Data API VPC endpoint should exist."""
-        vpc_id = networking_stack_outputs.get("VpcId")
-        assert vpc_id, "VpcId not found in networking outputs"
-
-        response = ec2_client.describe_vpc_endpoints(
-            Filters=[
-                {"Name": "vpc-id", "Values": [vpc_id]},
-                {"Name": "service-name", "Values": ["com.amazonaws.eu-central-1.redshift-data"]}
-            ]
-        )
-
-        endpoints = response.get("VpcEndpoints", [])
-        assert len(endpoints) >= 1, "Redshift Data API VPC endpoint not found"
-        assert endpoints[0]["State"] == "available", "Redshift Data endpoint not available"
+    @pytest.mark.parametrize("service", ERASURE_ENDPOINT_SERVICES)
+    def test_endpoint_exists(self, vpc_endpoints_by_service, aws_region, service):
+        """DynamoDB, Athena and Redshift Data API VPC endpoints should exist and be available."""
+        endpoint = vpc_endpoints_by_service.get(f"com.amazonaws.{aws_region}.{service}")
+        assert endpoint is not None, f"{service} VPC endpoint not found"
+        assert endpoint["State"] == "available", f"{service} endpoint not available"
 
 
 # =============================================================================
@@ -407,34 +307,17 @@ class TestVPCEndpoints:
 # =============================================================================
 
 @pytest.mark.phase4
+@pytest.mark.unit
 class TestCloudWatchResources:
     """Test CloudWatch resources for monitoring and audit."""
 
-    def test_log_group_exists(self, logs_client, environment_name):
-        """Lambda log group should exist."""
-        log_group_name = f"/aws/lambda/{environment_name}-erasure-handler"
-        response = logs_client.describe_log_groups(logGroupNamePrefix=log_group_name)
-
-        log_groups = response.get("logGroups", [])
-        matching = [lg for lg in log_groups if lg["logGroupName"] == log_group_name]
-        assert len(matching) >= 1, f"Log group {log_group_name} not found"
-
-    def test_log_group_retention(self, logs_client, environment_name):
-        """Log group should have 365-day retention for compliance."""
-        log_group_name = f"/aws/lambda/{environment_name}-erasure-handler"
-        response = logs_client.describe_log_groups(logGroupNamePrefix=log_group_name)
-
-        log_groups = response.get("logGroups", [])
-        matching = [lg for lg in log_groups if lg["logGroupName"] == log_group_name]
-        assert len(matching) >= 1, "Log group not found"
-
-        retention = matching[0].get("retentionInDays")
-        assert retention == 365, f"Expected 365-day retention, got {retention}"
-
-    def test_failure_alarm_exists(self, cloudwatch_client, environment_name):
-        """Erasure failure alarm should exist."""
-        alarm_name = f"{environment_name}-erasure-failures"
-        response = cloudwatch_client.describe_alarms(AlarmNames=[alarm_name])
+    @pytest.mark.parametrize("key,field,expected", CLOUDWATCH_CHECKS)
+    def test_cloudwatch_resource(self, cw_state, environment_name, key, field, expected):
+        """Log group should exist with 365-day retention and the failure alarm should exist."""
+        if isinstance(expected, str):
+            expected = expected.format(environment_name=environment_name)
+        resource = cw_state[key]
+        assert resource is not None, f"Erasure {key} not found (expected {field}={expected!r})"
 
-        alarms = response.get("MetricAlarms", [])
-        assert len(alarms) >= 1, f"Alarm {alarm_name} not found"
+        actual = resource.get(field)
+        assert actual == expected, f"Erasure {key} {field}: expected {expected!r}, got {actual!r}"